@@ -1,10 +1,37 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
 from app.routes import crawler
+from app.services.browser import close_browser_pool
+from app.services.create_tweet import close_bot
+from app.services import event_store
+from app.services.jobs import get_job_manager
+from app.services import workers
+from app.services.response_cache import ResponseCache, cached_response
+from datetime import date
+from typing import Dict, Iterator, Optional
 import json
 import os
 
-app = FastAPI()  
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own long-lived resources for the lifetime of the app"""
+    yield
+    # Stop background jobs so they record their outcome
+    await get_job_manager().shutdown()
+    # Shut down the shared headless browser used for JS-heavy pages
+    await close_browser_pool()
+    # Close the X client's pooled connections
+    await close_bot()
+    # Stop the CPU pool used for parsing
+    workers.shutdown()
+
+app = FastAPI(lifespan=lifespan)  
+
+# Pre-serialized /results pages, rebuilt when the event store changes
+results_cache = ResponseCache()
+event_store.on_change(lambda version: results_cache.invalidate())
 
 # Add CORS middleware
 app.add_middleware(
@@ -26,31 +53,115 @@ async def root():
     }
 
 @app.get("/results")
-async def get_results():
-    """Get processed results from responses.json"""
+async def get_results(
+    request: Request,
+    event_type: Optional[str] = None,
+    mode: Optional[str] = None,
+    source_url: Optional[str] = None,
+    start_after: Optional[str] = None,
+    start_before: Optional[str] = None,
+    upcoming: bool = False,
+    sort: str = "start_date",
+    order: str = "asc",
+    limit: int = event_store.DEFAULT_LIMIT,
+    offset: int = 0,
+    fields: Optional[str] = None
+):
+    """
+    Get processed events from the indexed event store
+    
+    Supports filtering by event_type, mode, source_url, ISO start date
+    range (start_after/start_before) and `upcoming` (events that have not
+    ended yet), sorting (start_date, end_date, ...), limit/offset pagination and
+    field projection (comma-separated `fields`). Responses are cached per
+    query and store version, carry a strong ETag (304 on match) and are
+    served pre-compressed.
+    """
     try:
-        # Path to responses.json
-        results_path = os.path.join("processed_results", "responses.json")
-        
-        # Check if file exists
-        if not os.path.exists(results_path):
+        if not os.path.exists(event_store.EVENTS_DB) and not os.path.exists(event_store.RESPONSES_FILE):
             return {
                 "status": "error",
                 "message": "No processed results found"
             }
+        
+        limit = max(1, min(limit, event_store.MAX_LIMIT))
+        
+        def build() -> Dict:
+            events, total = event_store.query_events(
+                event_type=event_type,
+                mode=mode,
+                source_url=source_url,
+                start_after=start_after,
+                start_before=start_before,
+                upcoming=upcoming,
+                sort=sort,
+                order=order,
+                limit=limit,
+                offset=offset,
+                fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+            )
+            return {
+                "status": "success",
+                "data": events,
+                "total": total,
+                "limit": limit,
+                "offset": offset
+            }
+        
+        key = tuple(sorted(request.query_params.multi_items()))
+        if upcoming:
+            # What counts as upcoming changes with the date, not just the store
+            key += (("today", date.today().isoformat()),)
+        cached = results_cache.get_or_build(key, event_store.get_version(), build)
+        return cached_response(request, cached)
             
-        # Read and return the results
-        with open(results_path, 'r') as f:
-            results = json.load(f)
-            
-        return {
-            "status": "success",
-            "data": results
-        }
-            
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error reading results: {str(e)}"
         )
 
+@app.get("/results/export")
+async def export_results(
+    event_type: Optional[str] = None,
+    mode: Optional[str] = None,
+    source_url: Optional[str] = None,
+    start_after: Optional[str] = None,
+    start_before: Optional[str] = None,
+    upcoming: bool = False,
+    updated_since: Optional[str] = None,
+    since_id: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Stream matching events as newline-delimited JSON
+    
+    Takes the same filters as /results. Events are read from the store in
+    batches and written as they are read, ordered by `updated_at`. For
+    incremental syncs pass the last `updated_at` seen as `updated_since`;
+    the stream then holds only events changed strictly after it, including
+    deletion tombstones ({"id", "updated_at", "deleted": true}). To resume
+    an interrupted stream, also pass the last `id` received as `since_id`.
+    """
+    if not os.path.exists(event_store.EVENTS_DB) and not os.path.exists(event_store.RESPONSES_FILE):
+        raise HTTPException(status_code=404, detail="No processed results found")
+    
+    events = event_store.iter_events(
+        event_type=event_type,
+        mode=mode,
+        source_url=source_url,
+        start_after=start_after,
+        start_before=start_before,
+        upcoming=upcoming,
+        updated_since=updated_since,
+        since_id=since_id,
+        fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    )
+    
+    def lines() -> Iterator[bytes]:
+        for event in events:
+            yield (json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8')
+    
+    return StreamingResponse(lines(), media_type='application/x-ndjson')
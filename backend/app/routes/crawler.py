@@ -1,93 +1,208 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from app.services.crawler import crawl_hackathons
 from app.services.processor import process_all_files
+from app.services.pipeline import run_pipeline
 from typing import Dict
-from app.services.create_tweet import XBot
+from app.services.create_tweet import get_bot, pending_tweets
+from app.services import llm_cache
+from app.services import pipeline_stats
+from app.services.jobs import Job, get_job_manager
+from app.services.response_cache import ResponseCache, cached_response
 
 router = APIRouter()
 
-@router.post("/crawl")
-async def trigger_crawl():
-    """Trigger hackathon discovery and crawling"""
-    try:
-        print("Starting crawl process...")
-        result = await crawl_hackathons()
-        return {
-            "status": "success",
-            "message": "Crawling completed",
-            "details": result
-        }
-    except Exception as e:
-        print(f"Error in crawl: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+# Pre-serialized /status body, rebuilt when the pipeline counters change
+status_cache = ResponseCache(max_entries=1)
+
+def coalesced_note(job: Job, created: bool, kind: str, params: Dict) -> Dict:
+    """Fields reporting a trigger folded into a running job of another kind or params"""
+    if created or job.matches(kind, params):
+        return {}
+    return {
+        "requested": {"kind": kind, "params": params},
+        "note": (f"A {job.kind} job with params {job.params} was already running; "
+                 f"this {kind} trigger was not applied separately")
+    }
+
+def job_response(job: Job, created: bool, kind: str, **params) -> Dict:
+    """Response for a trigger endpoint"""
+    return {
+        "status": "accepted" if created else "already_running",
+        "job_id": job.id,
+        "job": job.to_dict(),
+        **coalesced_note(job, created, kind, params)
+    }
+
+async def finished_response(job_id: str, message: str, note: Dict = None) -> Dict:
+    """Wait for a job and answer like the old synchronous endpoints did"""
+    job = await get_job_manager().wait(job_id)
+    if job["status"] != "success":
+        raise HTTPException(status_code=500, detail=job["error"] or f"Job {job['status']}")
+    return {
+        "status": "success",
+        "message": message,
+        "job_id": job_id,
+        "details": job["result"],
+        **(note or {})
+    }
+
+@router.post("/crawl", status_code=202)
+async def trigger_crawl(response: Response, wait: bool = False):
+    """
+    Start hackathon discovery and crawling as a background job
+    
+    Returns the job immediately. Crawl, process and pipeline jobs run one
+    at a time: a trigger while any of them is running returns the running
+    job. Pass wait=true to block until the crawl finishes.
+    """
+    print("Starting crawl process...")
+    job, created = get_job_manager().submit("crawl", crawl_hackathons)
+    if wait:
+        response.status_code = 200
+        return await finished_response(job.id, "Crawling completed", coalesced_note(job, created, "crawl", {}))
+    return job_response(job, created, "crawl")
 
-@router.post("/process")
-async def trigger_process():
+@router.post("/process", status_code=202)
+async def trigger_process(response: Response, refresh: bool = False, full: bool = False, wait: bool = False):
     """
-    Process stored HTML files with LLM
+    Process stored HTML files with LLM as a background job
     
-    This endpoint:
-    1. Reads all HTML files from crawled_data/html
+    The job:
+    1. Reads new or changed HTML files from crawled_data/html
     2. Cleans and chunks the HTML content
     3. Processes each chunk with LLM to extract event information
     4. Deduplicates and combines results
     5. Saves processed results to responses.json
+    
+    Pass refresh=true to ignore cached LLM responses for this run and
+    full=true to reprocess every file instead of only new or changed ones.
+    A trigger while a process, crawl or pipeline job is running returns the
+    running job. Pass wait=true to block until processing finishes.
     """
-    try:
-        print("Starting LLM processing...")
-        result = await process_all_files()
-        
-        if result["status"] == "error":
-            raise HTTPException(status_code=500, detail=result["message"])
-            
-        return {
-            "status": "success",
-            "message": "Processing completed",
-            "details": result
-        }
-    except Exception as e:
-        print(f"Error in processing: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    async def run() -> Dict:
+        with llm_cache.cache_bypass(refresh):
+            return await process_all_files(full=full)
+    
+    print("Starting LLM processing...")
+    job, created = get_job_manager().submit("process", run, refresh=refresh, full=full)
+    if wait:
+        response.status_code = 200
+        return await finished_response(job.id, "Processing completed",
+                                       coalesced_note(job, created, "process", {"refresh": refresh, "full": full}))
+    return job_response(job, created, "process", refresh=refresh, full=full)
+
+@router.post("/pipeline", status_code=202)
+async def trigger_pipeline(response: Response, wait: bool = False):
+    """
+    Crawl and process in one streaming background job
+    
+    Pages are handed to extraction workers as soon as they are crawled, so
+    the first events appear in /results while the crawl is still running.
+    A trigger while a crawl, process or pipeline job is running returns the
+    running job. Pass wait=true to block until the pipeline finishes.
+    """
+    print("Starting streaming pipeline...")
+    job, created = get_job_manager().submit("pipeline", run_pipeline)
+    if wait:
+        response.status_code = 200
+        return await finished_response(job.id, "Pipeline completed", coalesced_note(job, created, "pipeline", {}))
+    return job_response(job, created, "pipeline")
+
+@router.get("/jobs")
+async def list_jobs(limit: int = 20) -> Dict:
+    """Running jobs and recent job history"""
+    return {"status": "success", "jobs": get_job_manager().list_jobs(limit)}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict:
+    """State, per-stage progress and outcome of one job"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"status": "success", "job": job}
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str) -> Dict:
+    """Cancel a running job"""
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if not manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is not running")
+    return {"status": "success", "message": f"Cancelling job {job_id}"}
 
 @router.get("/status")
-async def get_processing_status() -> Dict:
-    """Get current processing statistics"""
+async def get_processing_status(request: Request):
+    """Get current processing statistics from the live pipeline counters"""
     try:
-        import os
-        from app.services.processor import HTML_DIR, OUTPUT_DIR
-        
-        # Count HTML files
-        html_files = len([f for f in os.listdir(HTML_DIR) if f.endswith('.html')]) if os.path.exists(HTML_DIR) else 0
-        
-        # Check processed results
-        results_file = os.path.join(OUTPUT_DIR, "responses.json")
-        processed_events = []
-        if os.path.exists(results_file):
-            with open(results_file, 'r') as f:
-                import json
-                processed_events = json.load(f)
-        
-        return {
-            "crawled_files": html_files,
-            "processed_events": len(processed_events),
-            "event_types": {
-                event_type: len([e for e in processed_events if e.get('event_type', '').lower() == event_type])
-                for event_type in ['hackathon', 'conference', 'meetup']
+        def build() -> Dict:
+            stats = pipeline_stats.get_stats()
+            return {
+                # Original keys, kept for existing clients
+                "crawled_files": stats["files_crawled"],
+                "processed_events": stats["events_total"],
+                "event_types": stats["events_by_type"],
+                **stats
             }
-        }
+        
+        cached = status_cache.get_or_build("status", pipeline_stats.get_version(), build)
+        return cached_response(request, cached)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
-@router.post("/tweet")
-async def post_tweets(max_events: int = 5):
-    """Post events to X.com"""
+@router.get("/llm-cache")
+async def get_llm_cache_stats() -> Dict:
+    """Get LLM response cache hit/miss counters"""
+    return llm_cache.get_stats()
+
+@router.delete("/llm-cache")
+async def clear_llm_cache() -> Dict:
+    """Invalidate every cached LLM response (e.g. after prompt changes)"""
     try:
-        bot = XBot()
-        results = bot.post_events(max_events=max_events)
+        removed = llm_cache.clear()
+        return {"status": "success", "removed_entries": removed}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing LLM cache: {str(e)}")
+
+@router.post("/tweet", status_code=202)
+async def post_tweets(response: Response, max_events: int = 5, wait: bool = False, dry_run: bool = False):
+    """
+    Post upcoming events to X.com as a background job
+    
+    Tweets go out over a pooled async client paced by X's rate limit
+    headers, so a batch never blocks other requests. Events already in the
+    posting ledger are skipped. A trigger while posting is running returns
+    the running job. Pass wait=true to block until the batch is posted, or
+    dry_run=true to see the next tweets without posting (or needing
+    credentials).
+    """
+    if dry_run:
+        response.status_code = 200
+        tweets = pending_tweets()
+        return {
+            "status": "success",
+            "dry_run": True,
+            "queued": len(tweets),
+            "tweets": tweets[:max(0, max_events)]
+        }
+    
+    try:
+        bot = get_bot()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def run() -> Dict:
+        results = await bot.post_events(max_events=max_events)
         return {
             "status": "success",
-            "tweets_posted": len(results),
+            "tweets_posted": sum(1 for r in results if r["result"]["status"] == "success"),
             "details": results
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    
+    print("Starting event posting...")
+    job, created = get_job_manager().submit("tweet", run, max_events=max_events)
+    if wait:
+        response.status_code = 200
+        return await finished_response(job.id, "Tweets posted",
+                                       coalesced_note(job, created, "tweet", {"max_events": max_events}))
+    return job_response(job, created, "tweet", max_events=max_events)
\ No newline at end of file
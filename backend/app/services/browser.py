@@ -0,0 +1,180 @@
+import asyncio  # For pool locking and concurrency limits
+import os  # For reading pool settings from the environment
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+load_dotenv()
+
+# Pool settings (override in .env)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+BROWSER_PAGE_TIMEOUT_MS = int(os.getenv("BROWSER_PAGE_TIMEOUT_MS", "30000"))
+BROWSER_IDLE_WAIT_MS = int(os.getenv("BROWSER_IDLE_WAIT_MS", "5000"))
+# Recycle a context after this many navigations to keep memory flat
+BROWSER_CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "50"))
+
+class BrowserPool:
+    """
+    One long-lived Chromium instance with a bounded pool of reusable contexts
+
+    Each context keeps a single page open. Callers borrow a page with
+    `async with pool.page() as page:` and give it back when done, so a
+    JS-rendered fetch costs a navigation instead of a browser launch. If the
+    browser disconnects, the next borrow relaunches it with a fresh pool;
+    pages borrowed before that are closed on return instead of rejoining it.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, user_agent: Optional[str] = None):
+        self.size = max(1, size)
+        self.user_agent = user_agent
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._contexts: List[BrowserContext] = []
+        self._uses = {}
+        self._start_lock = asyncio.Lock()
+        # Bumped on every launch and close; pages are only returned to their own generation
+        self._generation = 0
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        """Launch the browser once; safe to call repeatedly"""
+        async with self._start_lock:
+            if self.started:
+                return
+            if self._playwright is not None:
+                # Relaunching after a disconnect; drop the old driver
+                try:
+                    await self._playwright.stop()
+                except Exception as e:
+                    print(f"Error stopping old Playwright driver: {str(e)}")
+            print(f"Launching shared browser (pool size {self.size})")
+            self._generation += 1
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._idle = asyncio.Queue(maxsize=self.size)
+            self._contexts = []
+            self._uses = {}
+            for _ in range(self.size):
+                page = await self._new_page()
+                self._idle.put_nowait(page)
+
+    async def _new_page(self) -> Page:
+        """Create a fresh context with a single page"""
+        context = await self._browser.new_context(user_agent=self.user_agent)
+        context.set_default_timeout(BROWSER_PAGE_TIMEOUT_MS)
+        self._contexts.append(context)
+        page = await context.new_page()
+        self._uses[id(page)] = 0
+        return page
+
+    async def _recycle(self, page: Page) -> Page:
+        """Close a worn-out or broken page and replace its context"""
+        context = page.context
+        self._uses.pop(id(page), None)
+        if context in self._contexts:
+            self._contexts.remove(context)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Error closing browser context: {str(e)}")
+        return await self._new_page()
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page from the pool, waiting if all pages are in use"""
+        if not self.started:
+            await self.start()
+        generation = self._generation
+        page = await self._idle.get()
+        healthy = True
+        try:
+            yield page
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            if generation == self._generation and self._idle is not None:
+                await self._give_back(page, healthy)
+            else:
+                # The pool was relaunched or closed while this page was out
+                await self._discard(page)
+
+    async def _give_back(self, page: Page, healthy: bool):
+        """Return a borrowed page to the pool, recycling it if worn out or broken"""
+        generation = self._generation
+        try:
+            self._uses[id(page)] = self._uses.get(id(page), 0) + 1
+            if not healthy or page.is_closed() or self._uses[id(page)] >= BROWSER_CONTEXT_MAX_USES:
+                page = await self._recycle(page)
+            else:
+                # Drop cookies/storage so sites do not leak state between fetches
+                await page.context.clear_cookies()
+        except Exception as e:
+            print(f"Error returning page to pool: {str(e)}")
+        if generation != self._generation or self._idle is None:
+            await self._discard(page)  # Relaunched or closed meanwhile
+        else:
+            self._idle.put_nowait(page)
+
+    async def _discard(self, page: Page):
+        """Close a page from an earlier generation without touching the current pool"""
+        try:
+            await page.context.close()
+        except Exception:
+            pass  # Usually already gone with its browser
+
+    async def fetch_content(self, url: str) -> str:
+        """Navigate to a URL on a pooled page and return the rendered HTML"""
+        async with self.page() as page:
+            await page.goto(url, wait_until='domcontentloaded')
+            try:
+                # Give client-side rendering a bounded chance to settle
+                await page.wait_for_load_state('networkidle', timeout=BROWSER_IDLE_WAIT_MS)
+            except Exception:
+                pass
+            return await page.content()
+
+    async def close(self):
+        """Close every context, the browser and the Playwright driver"""
+        async with self._start_lock:
+            for context in self._contexts:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._contexts = []
+            self._uses = {}
+            self._idle = None
+            self._generation += 1
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    print(f"Error closing browser: {str(e)}")
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+                print("Shared browser closed")
+
+_pool: Optional[BrowserPool] = None
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool (started lazily on first use)"""
+    global _pool
+    if _pool is None:
+        from app.services.crawler import HEADERS
+        _pool = BrowserPool(user_agent=HEADERS['User-Agent'])
+    return _pool
+
+async def close_browser_pool():
+    """Shut down the shared browser if it was ever started"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,142 @@
+import os
+import re
+from typing import Dict, List
+from dotenv import load_dotenv
+from app.services.llm import estimate_tokens
+
+load_dotenv()
+
+# Chunk budget (override in .env)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "1000"))
+# Tokens of trailing context repeated at the start of the next chunk within a section
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "100"))
+
+# Running totals since startup, reported with processing results
+_stats = {"pages": 0, "chunks": 0, "tokens": 0, "max_chunk_tokens": 0}
+
+def blocks_from_text(text: str) -> List[Dict]:
+    """Text blocks for documents stored as plain text (paragraphs, else lines)"""
+    parts = re.split(r'\n\s*\n', text) if '\n\n' in text else text.split('\n')
+    return [{'type': 'text', 'text': part.strip()} for part in parts if part.strip()]
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    """Split an oversized block at lines, then sentences, then words"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for separator, pattern in (('\n', r'\n'), (' ', r'(?<=[.!?])\s+'), (' ', r'\s+')):
+        parts = [part for part in re.split(pattern, text) if part.strip()]
+        if len(parts) > 1:
+            break
+    else:
+        # One unbroken run of characters: cut it by size
+        size = max_tokens * 4
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    pieces, current = [], ''
+    for part in parts:
+        candidate = f"{current}{separator}{part}" if current else part
+        if estimate_tokens(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        if estimate_tokens(part) > max_tokens:
+            pieces.extend(_split_text(part, max_tokens))
+            current = ''
+        else:
+            current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _overlap(previous: List[str], heading: str, overlap_tokens: int) -> List[str]:
+    """Trailing pieces of a chunk (the last one cut at a word) totalling at most overlap_tokens"""
+    carry, carry_tokens = [], 0
+    for text in reversed(previous):
+        if text == heading:
+            break
+        tokens = estimate_tokens(text) + 1
+        if carry_tokens + tokens > overlap_tokens:
+            if not carry:
+                tail = text[-overlap_tokens * 4:]
+                carry.insert(0, tail.split(' ', 1)[-1] if ' ' in tail else tail)
+            break
+        carry.insert(0, text)
+        carry_tokens += tokens
+    return carry
+
+def chunk_blocks(blocks: List[Dict], max_tokens: int = CHUNK_MAX_TOKENS,
+                 overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    """
+    Pack document blocks into chunks of at most `max_tokens`
+
+    Blocks are kept whole where they fit; oversized ones are split at line,
+    sentence and word boundaries. A heading starts a new chunk once the
+    current one is at least half full, so sections stay together. A chunk
+    that continues a section starts with that section's heading and the
+    last `overlap_tokens` of the previous chunk.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    heading = None
+
+    def close():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append('\n\n'.join(current))
+        current, current_tokens = [], 0
+
+    for block in blocks:
+        is_heading = block.get('type') == 'heading'
+        if is_heading and current and current_tokens >= max_tokens // 2:
+            close()
+        if is_heading:
+            heading = block['text']
+
+        # Leave room for the heading and overlap carried into a continuation chunk
+        reserved = 0 if is_heading else overlap_tokens + (estimate_tokens(heading) + 1 if heading else 0)
+        for piece in _split_text(block['text'], max(max_tokens - reserved, max_tokens // 2)):
+            tokens = estimate_tokens(piece) + 1  # Plus the separator
+            if current and current_tokens + tokens > max_tokens:
+                previous = current
+                close()
+                carry = [] if is_heading else _overlap(previous, heading, overlap_tokens)
+                if heading and not is_heading:
+                    carry.insert(0, heading)
+                carry_tokens = sum(estimate_tokens(text) + 1 for text in carry)
+                if carry_tokens + tokens <= max_tokens:
+                    current, current_tokens = carry, carry_tokens
+            current.append(piece)
+            current_tokens += tokens
+    close()
+    return chunks
+
+def chunk_stats(chunks: List[str]) -> Dict:
+    """Chunk count and token sizes for one page"""
+    sizes = [estimate_tokens(chunk) for chunk in chunks]
+    return {
+        "chunks": len(chunks),
+        "tokens": sum(sizes),
+        "max_chunk_tokens": max(sizes, default=0),
+        "mean_chunk_tokens": round(sum(sizes) / len(sizes)) if sizes else 0
+    }
+
+def record(chunks: List[str]) -> Dict:
+    """Add one page's chunks to the running totals and return its stats"""
+    page = chunk_stats(chunks)
+    _stats["pages"] += 1
+    _stats["chunks"] += page["chunks"]
+    _stats["tokens"] += page["tokens"]
+    _stats["max_chunk_tokens"] = max(_stats["max_chunk_tokens"], page["max_chunk_tokens"])
+    return page
+
+def get_stats() -> Dict:
+    """Chunking totals since startup"""
+    return {
+        **_stats,
+        "chunks_per_page": round(_stats["chunks"] / _stats["pages"], 2) if _stats["pages"] else 0.0,
+        "mean_chunk_tokens": round(_stats["tokens"] / _stats["chunks"]) if _stats["chunks"] else 0,
+        "max_tokens": CHUNK_MAX_TOKENS,
+        "overlap_tokens": CHUNK_OVERLAP_TOKENS
+    }
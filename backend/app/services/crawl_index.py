@@ -0,0 +1,46 @@
+import json
+import os
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from app.services.jsonl_log import JsonlLog
+
+load_dotenv()
+
+# Compact once the log holds this many lines per live URL
+CRAWL_INDEX_COMPACT_RATIO = float(os.getenv("CRAWL_INDEX_COMPACT_RATIO", "2.0"))
+# ...and only once it is at least this long
+CRAWL_INDEX_COMPACT_MIN_LINES = int(os.getenv("CRAWL_INDEX_COMPACT_MIN_LINES", "1000"))
+
+class CrawlIndex(JsonlLog):
+    """
+    Append-only JSONL log of crawled pages, keyed by URL
+
+    See JsonlLog for the durability guarantees. A missing log is seeded
+    from the old rewrite-everything index.json when `legacy_path` exists.
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None, key_fn=None):
+        super().__init__(
+            path,
+            key_fn or (lambda page: page['url']),
+            compact_ratio=CRAWL_INDEX_COMPACT_RATIO,
+            compact_min_lines=CRAWL_INDEX_COMPACT_MIN_LINES
+        )
+        self.legacy_path = legacy_path
+
+    def _seed(self):
+        """Seed the log from the old rewrite-everything index.json"""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                pages = json.load(f)
+            print(f"Migrating {len(pages)} pages from {self.legacy_path}")
+            for page in pages:
+                self._records[self.key_fn(page)] = page
+            self.compact()
+        except Exception as e:
+            print(f"Error migrating legacy crawl index: {str(e)}")
+
+    def pages(self) -> List[Dict]:
+        return self.records()
@@ -1,22 +1,34 @@
 # Import required libraries
 import requests  # For making HTTP requests
-from bs4 import BeautifulSoup  # For parsing HTML content
-from typing import List, Dict  # For type hints
-import json  # For reading/writing JSON files
+from app.services.document import prepare_document  # Single-pass page parsing
+from app.services.workers import run_cpu  # CPU pool for parsing
+from app.services.html_store import get_html_store  # Files or compressed pack storage
+from app.services.crawl_index import CrawlIndex  # Append-only crawl log
+from app.services import pipeline_stats  # Live counters for /status
+from typing import List, Dict, Optional  # For type hints
 import os  # For file/directory operations
 from datetime import datetime  # For timestamp handling
-from googlesearch import search  # For Google search functionality
+from app.services.discovery import discover  # Cached, non-blocking search discovery
+from app.services.fetch_cache import FetchCache, body_hash  # Conditional re-fetching
 import asyncio  # For asynchronous operations
 import aiohttp  # For async HTTP requests
 import re  # For regular expressions
-from playwright.async_api import async_playwright
-from urllib.parse import urlparse
+from app.services.browser import get_browser_pool  # Shared headless browser pool
+from app.services.scheduler import (  # Per-host politeness and backoff
+    CrawlScheduler, CRAWL_MAX_CONCURRENCY, CRAWL_PER_HOST_CONCURRENCY,
+    CRAWL_MAX_RETRIES, CRAWL_MAX_RETRY_AFTER, RETRYABLE_STATUSES, host_of, parse_retry_after
+)
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 
 # Define browser headers to mimic real browser requests and avoid being blocked
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Search requests are scheduled like any other host, with their own delay
+SEARCH_ENGINE_URL = "https://www.google.com/search"
+SEARCH_DELAY = float(os.getenv("SEARCH_DELAY", "2.0"))
+
 # Create a function to handle directory setup
 def setup_directories():
     """Create necessary directories for storing crawled data"""
@@ -36,7 +48,8 @@ def setup_directories():
             'base_dir': base_dir,
             'data_dir': data_dir,
             'html_dir': html_dir,
-            'index_file': os.path.join(data_dir, 'index.json')
+            'index_file': os.path.join(data_dir, 'index.json'),
+            'index_log': os.path.join(data_dir, 'index.jsonl')
         }
     except Exception as e:
         print(f"Error setting up directories: {str(e)}")
@@ -49,120 +62,159 @@ except Exception as e:
     print(f"Fatal error setting up directories: {str(e)}")
     raise
 
-async def save_html_content(content: str, url: str) -> str:
+# Loaded lazily on first use
+_crawl_index = None
+
+async def save_html_content(content: str, url: str, metadata: Dict = None) -> str:
     """
-    Save HTML content to file with proper error handling
+    Save HTML content to the configured HTML store with proper error handling
     
     Args:
         content: HTML content to save
-        url: Source URL for generating filename
+        url: Source URL of the page
+        metadata: Prepared text, title and dates stored with the HTML
         
     Returns:
-        Path to saved file or None if failed
+        Document ID in the store or None if failed
     """
     try:
-        # Create a safe filename from URL
-        safe_filename = re.sub(r'[^a-zA-Z0-9]', '_', url.split('//')[-1])
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"hackathon_{timestamp}_{safe_filename[:50]}.html"
-        
-        # Ensure full path is valid
-        file_path = os.path.join(PATHS['html_dir'], filename)
-        
-        # Write content to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(f"Source URL: {url}\n\n")
-            f.write(content)
-            
+        # Compression, writes and fsync happen in a worker thread, off the event loop
+        doc_id = await asyncio.to_thread(get_html_store().save, url, content, metadata)
         print(f"Successfully saved HTML for {url}")
-        return file_path
+        return doc_id
     except Exception as e:
         print(f"Error saving HTML for {url}: {str(e)}")
         return None
 
-async def fetch_page_with_js(url: str, context: str) -> Dict:
-    """Fetch page using Playwright to handle JavaScript-rendered content"""
+async def store_page(html: str, url: str, context: str, digest: str, fetch_cache: FetchCache = None,
+                     js_rendered: bool = False, etag: str = None, last_modified: str = None) -> Dict:
+    """
+    Parse a fetched page once, save its main content and prepared text
+    
+    Returns:
+        Page record for the crawl index, or None if the page is irrelevant
+    """
+    # Parsing is CPU-bound, so it runs in the process pool off the event loop
+    crawled_at = datetime.now().isoformat()
+    doc = await run_cpu(prepare_document, html, url, crawled_at)
+    if doc is None:
+        return None
+    if not doc['relevant']:
+        # Remember rejected pages so an unchanged copy is not parsed again
+        if fetch_cache:
+            fetch_cache.update(url, digest, etag=etag, last_modified=last_modified)
+        return None
+    
+    # Save HTML content alongside the prepared text
+    metadata = {
+        'title': doc['title'],
+        'blocks': doc['blocks'],
+        'dates_found': doc['dates_found'],
+        'crawled_at': crawled_at
+    }
+    doc_id = await save_html_content(doc['main_html'], url, metadata)
+    if not doc_id:
+        return None
+    file_path = get_html_store().path_of(doc_id)
+    pipeline_stats.record_crawled()
+    if fetch_cache:
+        fetch_cache.update(url, digest, etag=etag, last_modified=last_modified, file_path=file_path or doc_id)
+    
+    return {
+        'url': url,
+        'context': context,
+        'doc_id': doc_id,
+        'file_path': file_path,
+        'dates_found': doc['dates_found'],
+        'crawled_at': crawled_at,
+        'title': doc['title'],
+        'js_rendered': js_rendered
+    }
+
+async def fetch_page_with_js(url: str, context: str, fetch_cache: FetchCache = None) -> Dict:
+    """Fetch page using the shared browser pool to handle JavaScript-rendered content"""
     try:
         print(f"Fetching with JS: {url}")
         
-        async with async_playwright() as p:
-            # Launch browser in headless mode
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Set timeout and go to URL
-            page.set_default_timeout(30000)
-            await page.goto(url, wait_until='networkidle')
-            
-            # Wait for content to load
-            await asyncio.sleep(2)  # Additional wait for dynamic content
-            
-            # Get the rendered HTML
-            content = await page.content()
-            
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Check for hackathon terms
-            text_content = soup.get_text().lower()
-            hackathon_terms = ['hackathon', 'register', 'registration', 'prize', 
-                             'deadline', 'submit', 'participate', 'team']
-            
-            if not any(term in text_content for term in hackathon_terms):
-                print(f"No hackathon terms found in {url}")
-                await browser.close()
-                return None
-            
-            # Clean HTML content
-            for tag in soup.find_all(['script', 'style']):
-                tag.decompose()
-            
-            # Try to get main content
-            main_content = (
-                soup.find('main') or 
-                soup.find('article') or 
-                soup.find('div', {'class': ['content', 'main-content']}) or 
-                soup.find('body')
-            )
-            
-            if not main_content:
-                print(f"No main content found in {url}")
-                await browser.close()
-                return None
-            
-            # Save HTML content
-            file_path = await save_html_content(str(main_content), url)
-            if not file_path:
-                await browser.close()
-                return None
-            
-            # Extract dates
-            date_patterns = [
-                r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-                r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',
-                r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}'
-            ]
-            
-            dates_found = []
-            for pattern in date_patterns:
-                dates_found.extend(re.findall(pattern, text_content))
-            
-            await browser.close()
-            
-            return {
-                'url': url,
-                'context': context,
-                'file_path': file_path,
-                'dates_found': dates_found,
-                'crawled_at': datetime.now().isoformat(),
-                'title': soup.title.string if soup.title else url,
-                'js_rendered': True
-            }
+        # Render on a pooled page instead of launching a new browser
+        content = await get_browser_pool().fetch_content(url)
+        
+        # Skip parsing and saving if the rendered page has not changed
+        digest = body_hash(content)
+        if fetch_cache and fetch_cache.is_unchanged(url, digest):
+            print(f"Unchanged since last crawl: {url}")
+            fetch_cache.mark_hit(url)
+            return None
+        
+        return await store_page(content, url, context, digest, fetch_cache, js_rendered=True)
             
     except Exception as e:
         print(f"Error processing {url} with JS: {str(e)}")
         return None
 
+# Query parameters that only track clicks and never change page content
+TRACKING_PARAMS = {
+    '__hstc', '__hssc', '__hsfp', '_hsenc', '_hsmi', 'hsctatracking',
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src'
+}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL used for fetching and deduplication
+    
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters (utm_*, HubSpot __hs*, click IDs), sorts the remaining query
+    and removes trailing slashes from non-root paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'http'
+    host = (parts.hostname or '').rstrip('.')
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+class CrawlFrontier:
+    """
+    Deduplicating set of URLs to fetch, shared by every query of a crawl
+    
+    `add` canonicalizes a URL and returns it the first time it is seen (on
+    either scheme, with or without "www."), and None for every repeat, so
+    each page is fetched, saved and processed once per crawl.
+    """
+    
+    def __init__(self):
+        self._seen: Dict[str, str] = {}
+        self.duplicates = 0
+    
+    @staticmethod
+    def _key(canonical: str) -> str:
+        parts = urlsplit(canonical)
+        host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+        return urlunsplit(('', host, parts.path, parts.query, ''))
+    
+    def add(self, url: str) -> Optional[str]:
+        canonical = canonicalize_url(url)
+        key = self._key(canonical)
+        if key in self._seen:
+            self.duplicates += 1
+            return None
+        self._seen[key] = canonical
+        return canonical
+    
+    def __len__(self) -> int:
+        return len(self._seen)
+
 def is_js_heavy_site(url: str) -> bool:
     """Check if site likely requires JavaScript"""
     domain = urlparse(url).netloc.lower()
@@ -177,94 +229,78 @@ def is_js_heavy_site(url: str) -> bool:
     ]
     return any(site in domain for site in js_heavy_sites)
 
-async def fetch_page(session: aiohttp.ClientSession, url: str, context: str) -> Dict:
-    """Fetch page with appropriate method based on site"""
+async def fetch_page(session: aiohttp.ClientSession, url: str, context: str,
+                     scheduler: CrawlScheduler = None, fetch_cache: FetchCache = None) -> Dict:
+    """
+    Fetch page with appropriate method based on site, politely per host
+    
+    With a fetch cache, pages are requested conditionally and a 304 or an
+    unchanged body hash returns None without parsing or saving anything.
+    """
+    scheduler = scheduler or CrawlScheduler()
     if is_js_heavy_site(url):
-        return await fetch_page_with_js(url, context)
+        async with scheduler.slot(url):
+            return await fetch_page_with_js(url, context, fetch_cache)
     else:
         try:
-            print(f"Fetching: {url}")
-            async with session.get(url, headers=HEADERS, timeout=30) as response:
-                if response.status != 200:
-                    print(f"Error {response.status} for {url}")
-                    return None
-                    
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Check for hackathon terms
-                text_content = soup.get_text().lower()
-                hackathon_terms = ['hackathon', 'register', 'registration', 'prize', 
-                                'deadline', 'submit', 'participate', 'team']
-                
-                if not any(term in text_content for term in hackathon_terms):
-                    print(f"No hackathon terms found in {url}")
-                    return None
-                
-                # Clean HTML content
-                for tag in soup.find_all(['script', 'style']):
-                    tag.decompose()
-                
-                # Try to get main content
-                main_content = (
-                    soup.find('main') or 
-                    soup.find('article') or 
-                    soup.find('div', {'class': ['content', 'main-content']}) or 
-                    soup.find('body')
-                )
-                
-                if not main_content:
-                    print(f"No main content found in {url}")
-                    return None
-                
-                # Save HTML content
-                file_path = await save_html_content(str(main_content), url)
-                if not file_path:
-                    return None
-                
-                # Extract dates
-                date_patterns = [
-                    r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-                    r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',
-                    r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}'
-                ]
-                
-                dates_found = []
-                for pattern in date_patterns:
-                    dates_found.extend(re.findall(pattern, text_content))
-                
-                return {
-                    'url': url,
-                    'context': context,
-                    'file_path': file_path,
-                    'dates_found': dates_found,
-                    'crawled_at': datetime.now().isoformat(),
-                    'title': soup.title.string if soup.title else url,
-                    'js_rendered': False
-                }
-                
+            html = None
+            request_headers = dict(HEADERS)
+            if fetch_cache:
+                request_headers.update(fetch_cache.conditional_headers(url))
+            for attempt in range(CRAWL_MAX_RETRIES + 1):
+                print(f"Fetching: {url}")
+                async with scheduler.slot(url):
+                    async with session.get(url, headers=request_headers, timeout=30) as response:
+                        if response.status == 304 and fetch_cache:
+                            print(f"Not modified: {url}")
+                            fetch_cache.mark_hit(url)
+                            return None
+                        if response.status == 200:
+                            html = await response.text()
+                            etag = response.headers.get('ETag')
+                            last_modified = response.headers.get('Last-Modified')
+                            break
+                        if response.status not in RETRYABLE_STATUSES or attempt == CRAWL_MAX_RETRIES:
+                            print(f"Error {response.status} for {url}")
+                            return None
+                        # Honor Retry-After, falling back to exponential backoff
+                        delay = parse_retry_after(response.headers.get('Retry-After'))
+                        if delay is None:
+                            delay = 2 ** (attempt + 1)
+                        if delay > CRAWL_MAX_RETRY_AFTER:
+                            print(f"Retry-After {delay:.0f}s too long for {url}, skipping")
+                            return None
+                scheduler.backoff(url, delay)
+            
+            # Same bytes as last time: nothing to parse, save or process
+            digest = body_hash(html)
+            if fetch_cache and fetch_cache.is_unchanged(url, digest):
+                print(f"Unchanged since last crawl: {url}")
+                fetch_cache.mark_hit(url)
+                return None
+            
+            return await store_page(html, url, context, digest, fetch_cache,
+                                    etag=etag, last_modified=last_modified)
+            
         except Exception as e:
             print(f"Error processing {url}: {str(e)}")
             return None
 
+def get_crawl_index() -> CrawlIndex:
+    """Process-wide crawl index keyed by canonical URL"""
+    global _crawl_index
+    if _crawl_index is None:
+        _crawl_index = CrawlIndex(
+            PATHS['index_log'],
+            legacy_path=PATHS['index_file'],
+            key_fn=lambda page: canonicalize_url(page['url'])
+        )
+    return _crawl_index
+
 def save_results(pages: List[Dict]):
-    """Save crawled pages to index"""
+    """Append crawled pages to the index log (O(new pages), not O(history))"""
     try:
-        existing = load_results()
-        
-        # Use URL as key to avoid duplicates
-        url_to_page = {page['url']: page for page in existing}
-        
-        new_count = 0
-        for page in pages:
-            if page['url'] not in url_to_page:
-                url_to_page[page['url']] = page
-                new_count += 1
-        
-        # Save updated index
-        with open(PATHS['index_file'], 'w') as f:
-            json.dump(list(url_to_page.values()), f, indent=2)
-        
+        new_count = get_crawl_index().append(pages)
         print(f"Saved {new_count} new pages")
     except Exception as e:
         print(f"Error saving results: {str(e)}")
@@ -272,9 +308,7 @@ def save_results(pages: List[Dict]):
 def load_results() -> List[Dict]:
     """Load saved results"""
     try:
-        if os.path.exists(PATHS['index_file']):
-            with open(PATHS['index_file'], 'r') as f:
-                return json.load(f)
+        return get_crawl_index().pages()
     except Exception as e:
         print(f"Error loading results: {str(e)}")
     return []
@@ -286,6 +320,7 @@ def get_search_queries() -> List[Dict[str, str]]:
     Returns a list of dictionaries containing:
     - query: The search string to use
     - context: Category/type of the hackathon search
+    - date_filter: Date filter embedded in the query (used as a cache key)
     
     Uses current date to filter for upcoming events
     """
@@ -300,7 +335,7 @@ def get_search_queries() -> List[Dict[str, str]]:
     date_filter = f"after:{current_month} {current_date}"
     
     # Return list of search queries with their contexts
-    return [
+    queries = [
         {
             'query': f"upcoming web3, ai, blockchain hackathon {current_year}, {next_year} registration open {date_filter}",
             'context': 'upcoming'
@@ -334,14 +369,20 @@ def get_search_queries() -> List[Dict[str, str]]:
             'context': 'blockchain'
         }
     ]
+    for query_info in queries:
+        query_info['date_filter'] = date_filter
+    return queries
 
-async def search_hackathons(query: str, num_results: int = 8) -> List[str]:
+async def search_hackathons(query: str, num_results: int = 8, date_filter: str = "",
+                            scheduler: CrawlScheduler = None) -> List[str]:
     """
-    Search for hackathon URLs using Google search
+    Search for hackathon URLs using the configured discovery backend
     
     Args:
         query: Search query string
         num_results: Maximum number of results to return
+        date_filter: Date filter used in the query, for result caching
+        scheduler: Crawl scheduler used to pace uncached searches
         
     Returns:
         List of filtered URLs that likely contain hackathon information
@@ -350,8 +391,9 @@ async def search_hackathons(query: str, num_results: int = 8) -> List[str]:
         print(f"Searching: {query}")
         # Add negative terms to exclude irrelevant results
         search_query = f"{query} -github -youtube -past -winners -completed -ended"
-        # Perform Google search
-        results = list(search(search_query, num_results=num_results))
+        # Search off the event loop, reusing cached results when fresh
+        throttle = (lambda: scheduler.slot(SEARCH_ENGINE_URL)) if scheduler else None
+        results = await discover(search_query, date_filter, num_results=num_results, throttle=throttle)
         
         # Filter out unwanted URLs that likely don't contain relevant info
         filtered_results = []
@@ -369,7 +411,7 @@ async def search_hackathons(query: str, num_results: int = 8) -> List[str]:
         print(f"Search error: {str(e)}")
         return []
 
-async def crawl_hackathons() -> Dict:
+async def crawl_hackathons(page_queue: Optional[asyncio.Queue] = None) -> Dict:
     """
     Main function to discover and crawl hackathon pages
     
@@ -379,41 +421,101 @@ async def crawl_hackathons() -> Dict:
     3. Fetches and processes pages
     4. Saves results
     
+    Progress and the run's outcome are reported to the pipeline counters.
+    
+    Args:
+        page_queue: Optional bounded queue that receives each stored page as
+            soon as it is saved. When consumers fall behind and the queue
+            fills up, new fetches wait, so backpressure reaches the crawler.
+    
     Returns:
         Dictionary with crawling statistics and results
     """
+    pipeline_stats.start_run("crawl", stage="starting", queries_total=0, queries_done=0, urls_queued=0, pages_fetched=0)
+    result = {"status": "cancelled"}
+    try:
+        result = await _crawl(page_queue)
+        return result
+    finally:
+        pipeline_stats.finish_run("crawl", status=result["status"], pages_crawled=result.get("pages_crawled", 0))
+
+async def _crawl(page_queue: Optional[asyncio.Queue] = None) -> Dict:
+    """Body of crawl_hackathons"""
     try:
         print("Starting hackathon discovery")
         all_pages = []
         
         # Get list of search queries
         queries = get_search_queries()
+        pipeline_stats.update_progress("crawl", stage="crawling", queries_total=len(queries))
+        
+        # Validators from previous crawls for conditional requests
+        fetch_cache = FetchCache(os.path.join(PATHS['data_dir'], 'fetch_cache.json'))
+        
+        # Shared frontier dedups canonical URLs across all queries
+        frontier = CrawlFrontier()
         
-        # Create async session and process queries
-        async with aiohttp.ClientSession() as session:
-            for query_info in queries:
-                # Search for URLs
-                urls = await search_hackathons(query_info['query'])
-                if urls:
-                    # Create tasks for fetching each URL
-                    tasks = [fetch_page(session, url, query_info['context']) for url in urls]
-                    # Run tasks concurrently
-                    results = await asyncio.gather(*tasks)
-                    # Add successful results to list
-                    all_pages.extend([r for r in results if r])
+        # One scheduler for the whole crawl so limits apply across queries
+        scheduler = CrawlScheduler(host_delays={host_of(SEARCH_ENGINE_URL): SEARCH_DELAY})
+        connector = aiohttp.TCPConnector(limit=CRAWL_MAX_CONCURRENCY, limit_per_host=CRAWL_PER_HOST_CONCURRENCY)
+        
+        # Pages fetched but not yet taken by the queue's consumers
+        in_flight = asyncio.Semaphore(max(1, page_queue.maxsize)) if page_queue is not None else None
+        
+        # Create async session and process all queries concurrently
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def crawl_query(query_info: Dict) -> List[Dict]:
+                # Searches share the scheduler so the search engine is paced too
+                urls = await search_hackathons(query_info['query'], date_filter=query_info['date_filter'],
+                                               scheduler=scheduler)
+                # Only fetch URLs no other query has already claimed
+                urls = [c for c in (frontier.add(url) for url in urls) if c]
+                pipeline_stats.increment_progress("crawl", "queries_done")
+                pipeline_stats.increment_progress("crawl", "urls_queued", len(urls))
+                if not urls:
+                    return []
+                
+                async def fetch_one(url: str) -> Dict:
+                    if in_flight is None:
+                        page = await fetch_page(session, url, query_info['context'], scheduler, fetch_cache)
+                        pipeline_stats.increment_progress("crawl", "pages_fetched")
+                        return page
+                    async with in_flight:
+                        page = await fetch_page(session, url, query_info['context'], scheduler, fetch_cache)
+                        pipeline_stats.increment_progress("crawl", "pages_fetched")
+                        if page:
+                            # Blocks while the queue is full
+                            await page_queue.put(page)
+                        return page
                 
-                # Delay between queries to avoid rate limiting
-                await asyncio.sleep(2)
+                # Create tasks for fetching each URL
+                tasks = [fetch_one(url) for url in urls]
+                results = await asyncio.gather(*tasks)
+                # Keep successful results
+                return [r for r in results if r]
+            
+            query_results = await asyncio.gather(*[crawl_query(q) for q in queries])
+            for pages in query_results:
+                all_pages.extend(pages)
+        
+        pipeline_stats.update_progress("crawl", stage="saving")
+        fetch_cache.save()
         
         # Save results if any pages were found
         if all_pages:
-            save_results(all_pages)
+            # One atomic, fsynced batch; written in a thread to keep the loop free
+            await asyncio.to_thread(save_results, all_pages)
+            pipeline_stats.set_crawled(get_html_store().count())
         
         # Prepare result summary
         result = {
             "status": "success",
             "pages_crawled": len(all_pages),
-            "contexts": list(set(page['context'] for page in all_pages))
+            "pages_unchanged": fetch_cache.hits,
+            "unique_urls": len(frontier),
+            "duplicate_urls_skipped": frontier.duplicates,
+            "contexts": list(set(page['context'] for page in all_pages)),
+            "hosts": scheduler.stats()
         }
         print(f"\nFinal result: {result}")
         return result
@@ -1,13 +1,81 @@
-from requests_oauthlib import OAuth1Session
-import os
+import asyncio
+import aiohttp  # Async HTTP with connection reuse
 import json
-from datetime import datetime
-from typing import Dict, List
-from dotenv import load_dotenv
+import os
+import random
 import time
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from oauthlib.oauth1 import Client as OAuth1Client  # OAuth 1.0a request signing
+from app.services import dates
+from app.services import event_store
+from app.services import pipeline_stats
+from app.services.jsonl_log import JsonlLog  # Append-only JSONL log with an in-memory index
 
 load_dotenv()
 
+X_API_URL = "https://api.twitter.com/2"
+# Retries of a request after a network error, 429 or 5xx response
+X_MAX_RETRIES = int(os.getenv("X_MAX_RETRIES", "3"))
+# Longest wait for a rate limit window to reset before giving up on a batch
+X_MAX_RATE_LIMIT_WAIT = float(os.getenv("X_MAX_RATE_LIMIT_WAIT", "900"))
+X_REQUEST_TIMEOUT = float(os.getenv("X_REQUEST_TIMEOUT", "30"))
+
+# Events already posted, one JSON object per line keyed by event id
+TWEET_LEDGER_FILE = os.path.join("processed_results", "tweet_ledger.jsonl")
+
+# Status codes worth retrying
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# (remaining, reset) header pairs X sends; the most restrictive window applies
+RATE_LIMIT_HEADERS = [
+    ("x-rate-limit-remaining", "x-rate-limit-reset"),
+    ("x-app-limit-24hour-remaining", "x-app-limit-24hour-reset"),
+    ("x-user-limit-24hour-remaining", "x-user-limit-24hour-reset")
+]
+
+class RateLimited(Exception):
+    """The endpoint's rate limit resets later than we are willing to wait"""
+
+    def __init__(self, reset_at: float):
+        self.reset_at = reset_at
+        super().__init__(f"Rate limited until {datetime.fromtimestamp(reset_at).isoformat()}")
+
+class RateLimit:
+    """Remaining requests and reset time of one endpoint, from its response headers"""
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+
+    def update(self, headers):
+        remaining, reset_at = None, None
+        for remaining_key, reset_key in RATE_LIMIT_HEADERS:
+            try:
+                value = int(headers[remaining_key])
+                reset = float(headers[reset_key]) if headers.get(reset_key) else None
+            except (KeyError, ValueError):
+                continue
+            if remaining is None or value < remaining or (value == remaining and (reset or 0) > (reset_at or 0)):
+                remaining, reset_at = value, reset
+        if remaining is not None:
+            self.remaining, self.reset_at = remaining, reset_at
+
+    def exhaust(self):
+        """Treat the window as used up (after a 429)"""
+        self.remaining = 0
+
+    def wait_seconds(self) -> float:
+        """How long to wait before the next request (0 while requests remain)"""
+        if self.remaining is None or self.remaining > 0 or self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - time.time())
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: ~1s, 2s, 4s, ..."""
+    return (2 ** attempt) * (0.5 + random.random())
+
 class XBot: 
     def __init__(self):
         # Get credentials from environment variables
@@ -20,69 +88,131 @@ class XBot:
         if not all([self.api_key, self.api_secret, self.access_token, self.access_token_secret]):
             raise ValueError("Missing required X API credentials in .env file")
         
-        print("Initializing with credentials:")
-        print(f"API Key: {self.api_key[:8]}...")
-        print(f"Access Token: {self.access_token[:8]}...")
-        
-        # Create OAuth1Session with stored credentials
-        self.oauth = OAuth1Session(
-            client_key=self.api_key,
+        # Signs every request (fresh nonce and timestamp each time)
+        self.signer = OAuth1Client(
+            self.api_key,
             client_secret=self.api_secret,
             resource_owner_key=self.access_token,
             resource_owner_secret=self.access_token_secret
         )
-        
-        # Verify credentials
-        self.verify_credentials()
+        # Opened on first request so it belongs to the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.rate_limits: Dict[str, RateLimit] = {}
+        # Username from the last successful verification (None until verified)
+        self.username: Optional[str] = None
+        self._verify_lock = asyncio.Lock()
 
-    def verify_credentials(self):
-        """Verify the credentials are working"""
-        try:
-            print("\nVerifying credentials...")
-            print(f"Using API Key: {self.api_key[:8]}...")
-            print(f"Using API Secret: {self.api_secret[:8]}...")
-            print(f"Using Access Token: {self.access_token[:8]}...")
-            print(f"Using Access Token Secret: {self.access_token_secret[:8]}...")
-            
-            # Test endpoint
-            response = self.oauth.get(
-                "https://api.twitter.com/2/users/me",
-                headers={"Content-Type": "application/json"}
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=X_REQUEST_TIMEOUT)
             )
-            
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
-            print(f"Response Body: {response.text}")
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                print(f"\nSuccessfully authenticated as: {user_data.get('data', {}).get('username')}")
-            else:
-                print("\nAuthentication failed!")
-                print(f"Status Code: {response.status_code}")
-                print(f"Response: {response.text}")
-                raise ValueError("Failed to verify credentials")
-                
-        except Exception as e:
-            print(f"\nError verifying credentials: {str(e)}")
-            raise
+        return self.session
+
+    async def close(self):
+        """Close the pooled connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def request(self, method: str, path: str, payload: Dict = None) -> Tuple[int, str, Dict]:
+        """
+        Signed request to the X API, paced by the endpoint's rate limit headers
+
+        Waits out an exhausted rate limit window (up to X_MAX_RATE_LIMIT_WAIT)
+        and retries network errors, 429 and 5xx responses with exponential
+        backoff.
+
+        Returns:
+            (status code, response body, response headers)
+
+        Raises:
+            RateLimited: if the window resets later than X_MAX_RATE_LIMIT_WAIT
+        """
+        url = f"{X_API_URL}{path}"
+        limit = self.rate_limits.setdefault(f"{method} {path}", RateLimit())
+        session = await self._get_session()
+        for attempt in range(X_MAX_RETRIES + 1):
+            wait = limit.wait_seconds()
+            if wait > X_MAX_RATE_LIMIT_WAIT:
+                raise RateLimited(limit.reset_at)
+            if wait > 0:
+                print(f"X rate limit reached for {method} {path}, waiting {wait:.0f}s")
+                await asyncio.sleep(wait)
+
+            _, headers, _ = self.signer.sign(url, http_method=method,
+                                             headers={"Content-Type": "application/json"})
+            headers["Accept"] = "application/json"
+            try:
+                async with session.request(method, url, json=payload, headers=headers) as response:
+                    body = await response.text()
+                    status = response.status
+                    limit.update(response.headers)
+                    response_headers = dict(response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == X_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"X request {method} {path} failed ({str(e)}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if status not in RETRYABLE_STATUSES or attempt == X_MAX_RETRIES:
+                return status, body, response_headers
+            if status == 429:
+                limit.exhaust()
+                if limit.wait_seconds() > 0:
+                    continue  # Wait for the reset at the top of the loop
+            delay = backoff_delay(attempt)
+            print(f"X returned {status} for {method} {path}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return status, body, response_headers
 
-    def format_event_tweet(self, event: Dict) -> str:
+    async def verify_credentials(self, force: bool = False) -> str:
+        """
+        Verify the credentials once per process
+
+        Later calls return the cached username without a request, until
+        force=True or a post is rejected as unauthorized.
+
+        Returns:
+            Username of the authenticated account
+        """
+        async with self._verify_lock:
+            if self.username and not force:
+                return self.username
+            print("Verifying X credentials...")
+            status, body, _ = await self.request("GET", "/users/me")
+            if status != 200:
+                print(f"Authentication failed with status {status}")
+                raise ValueError(f"Failed to verify credentials (status {status})")
+            self.username = json.loads(body).get('data', {}).get('username')
+            print(f"Successfully authenticated as: {self.username}")
+            return self.username
+
+    @staticmethod
+    def format_event_tweet(event: Dict) -> str:
         """Format event data into an engaging tweet"""
         # Get event details with fallbacks
-        title = event.get('title', 'Upcoming Tech Event')
-        date_info = event.get('date', {})
-        start_date = date_info.get('start', 'TBA')
-        end_date = date_info.get('end', '')
+        title = event.get('title') or 'Upcoming Tech Event'
+        # Extracted fields are loosely typed: date and prizes may be plain strings or null
+        date_info = event.get('date')
+        if isinstance(date_info, dict):
+            start_date = date_info.get('start') or 'TBA'
+            end_date = date_info.get('end') or ''
+        else:
+            start_date, end_date = str(date_info or 'TBA'), ''
         
-        prize_info = event.get('prizes', {})
-        prize_pool = prize_info.get('total_pool', '')
+        prize_info = event.get('prizes')
+        prize_pool = prize_info.get('total_pool') if isinstance(prize_info, dict) else prize_info
+        prize_pool = str(prize_pool or '')
         
-        tech_stack = event.get('tech_stack', [])
-        tech_tags = ' '.join([f"#{tech.replace(' ', '')}" for tech in tech_stack[:3]])
+        tech_stack = event.get('tech_stack') or []
+        if isinstance(tech_stack, str):
+            tech_stack = [tech_stack]
+        tech_tags = ' '.join([f"#{str(tech).replace(' ', '')}" for tech in tech_stack[:3]])
         
-        event_type = event.get('event_type', '').lower()
-        mode = event.get('mode', '').lower()
+        event_type = str(event.get('event_type') or '').lower()
+        mode = str(event.get('mode') or '').lower()
         
         # Emoji mapping
         type_emoji = {
@@ -115,7 +245,7 @@ class XBot:
             tweet += f"\n{tech_tags}"
             
         # Add general hashtags
-        tweet += f" #{event_type} #tech"
+        tweet += f" #{event_type.replace(' ', '')} #tech" if event_type else " #tech"
         
         # Add source URL
         if event.get('source_url'):
@@ -131,119 +261,195 @@ class XBot:
 
         return tweet
 
-    def post_tweet(self, tweet_text: str) -> Dict:
+    async def post_tweet(self, tweet_text: str) -> Dict:
         """Post a tweet using X API v2 with OAuth 1.0a"""
+        # Prepare payload
+        payload = {"text": tweet_text}
         try:
-            # Endpoint for v2 tweets
-            url = "https://api.twitter.com/2/tweets"
-            
-            # Prepare payload
-            payload = {"text": tweet_text}
-
-            # Add required headers
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-
-            # Make request
-            response = self.oauth.post(
-                url,
-                json=payload,
-                headers=headers
-            )
+            status, body, _ = await self.request("POST", "/tweets", payload)
 
-            if response.status_code != 201:
-                print(f"Error posting tweet: {response.status_code}")
-                print(f"Response: {response.text}")
+            if status != 201:
+                if status == 401:
+                    self.username = None  # Verify again before the next batch
+                print(f"Error posting tweet: {status}")
+                print(f"Response: {body}")
                 print(f"Request payload: {payload}")
-                return {"status": "error", "message": response.text}
+                return {"status": "error", "message": body}
 
             print(f"Tweet posted successfully!")
-            return {"status": "success", "data": response.json()}
+            return {"status": "success", "data": json.loads(body)}
 
+        except RateLimited as e:
+            print(f"Error posting tweet: {str(e)}")
+            return {"status": "error", "message": str(e), "rate_limited": True}
         except Exception as e:
             print(f"Error posting tweet: {str(e)}")
             return {"status": "error", "message": str(e)}
 
-    def post_events(self, max_events: int = 5) -> List[Dict]:
-        """Post multiple events as tweets"""
+    async def post_events(self, max_events: int = 5) -> List[Dict]:
+        """
+        Post the next upcoming events that have not been posted yet
+
+        Tweets come from the precomputed queue and each successful post is
+        recorded in the ledger right away, so a later batch (or a retry
+        after a crash) never posts the same event twice. Pacing comes from
+        the rate limit headers of the tweet endpoint; the batch stops early
+        if the limit resets later than X_MAX_RATE_LIMIT_WAIT.
+
+        Raises:
+            ValueError: if the credentials cannot be verified, so the job
+            fails instead of reporting an empty successful batch
+        """
         results = []
+        status = "success"
+        pipeline_stats.start_run("tweet", posted=0, failed=0)
         try:
-            # Read events from JSON
-            with open("processed_results/responses.json", "r") as f:
-                events = json.load(f)
-
-            # Sort events by date
-            events.sort(key=lambda x: x.get('date', {}).get('start', ''), reverse=True)
+            await self.verify_credentials()
+            ledger = get_ledger()
+            batch = pending_tweets(max_events)
+            pipeline_stats.update_progress("tweet", total=len(batch))
 
-            # Post tweets for recent events
-            for event in events[:max_events]:
-                tweet_text = self.format_event_tweet(event)
-                result = self.post_tweet(tweet_text)
+            for item in batch:
+                result = await self.post_tweet(item['tweet'])
                 results.append({
-                    "event": event['title'],
-                    "tweet": tweet_text,
+                    "event": item['title'],
+                    "event_id": item['event_id'],
+                    "tweet": item['tweet'],
                     "result": result
                 })
                 
                 if result["status"] == "error":
-                    print(f"Error posting tweet for {event['title']}")
+                    print(f"Error posting tweet for {item['title']}")
+                    pipeline_stats.increment_progress("tweet", "failed")
+                    if result.get("rate_limited"):
+                        break
                     continue
-
-                # Rate limiting
-                if len(results) < max_events:
-                    time.sleep(2)
+                await asyncio.to_thread(ledger.append, [{
+                    "event_id": item['event_id'],
+                    "title": item['title'],
+                    "tweet_id": result["data"].get("data", {}).get("id"),
+                    "posted_at": datetime.now().isoformat()
+                }])
+                pipeline_stats.increment_progress("tweet", "posted")
 
             return results
 
         except Exception as e:
             print(f"Error posting events: {str(e)}")
-            return results
+            status = "error"
+            raise
+        finally:
+            posted = sum(1 for r in results if r["result"]["status"] == "success")
+            pipeline_stats.finish_run("tweet", status=status, posted=posted, failed=len(results) - posted)
 
-    def test_auth(self):
+    async def test_auth(self):
         """Test authentication with a simple tweet"""
         try:
             print("\nTesting authentication with a test tweet...")
             
             # Simple test tweet
             test_tweet = "Test tweet from Pathfinder Bot 🤖 " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Endpoint for v2 tweets
-            url = "https://api.twitter.com/2/tweets"
-            
-            # Prepare payload and headers
-            payload = {"text": test_tweet}
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-
-            # Make request
-            response = self.oauth.post(
-                url,
-                json=payload,
-                headers=headers
-            )
+            status, body, _ = await self.request("POST", "/tweets", {"text": test_tweet})
 
-            print(f"\nResponse Status: {response.status_code}")
-            print(f"Response Headers: {dict(response.headers)}")
-            print(f"Response Body: {response.text}")
+            print(f"\nResponse Status: {status}")
+            print(f"Response Body: {body}")
 
-            return response.status_code == 201
+            return status == 201
 
         except Exception as e:
             print(f"\nError testing auth: {str(e)}")
             return False
 
-if __name__ == "__main__":
+_bot: Optional[XBot] = None
+
+def get_bot() -> XBot:
+    """Return the process-wide bot (raises ValueError if credentials are missing)"""
+    global _bot
+    if _bot is None:
+        _bot = XBot()
+    return _bot
+
+async def close_bot():
+    """Close the bot's connections, if it was ever created"""
+    if _bot is not None:
+        await _bot.close()
+
+_ledger: Optional[JsonlLog] = None
+
+def get_ledger() -> JsonlLog:
+    """Posting ledger: every posted event keyed by event_store.event_id"""
+    global _ledger
+    if _ledger is None:
+        _ledger = JsonlLog(TWEET_LEDGER_FILE, key_fn=lambda entry: entry['event_id'])
+    return _ledger
+
+_queue: List[Dict] = []
+_queue_key: Optional[Tuple[int, str]] = None
+
+def tweet_queue() -> List[Dict]:
+    """
+    Formatted tweets for every upcoming event, soonest first, undated last
+
+    Built in one pass over the event store and reused until the store
+    changes or the day rolls over, so posting batches and dry runs do not
+    re-read, re-sort and re-format the whole event set.
+    """
+    global _queue, _queue_key
+    today = date.today().isoformat()
+    key = (event_store.get_version(), today)
+    if key == _queue_key:
+        return _queue
+
+    queued = []
+    for event in event_store.iter_events():
+        start, end = dates.event_dates(event)
+        if (end or start or today) < today:
+            continue  # Already over
+        try:
+            tweet = XBot.format_event_tweet(event)
+        except Exception as e:
+            # One malformed event must not hold up the whole queue
+            print(f"Skipping event {event.get('id')} that could not be formatted: {str(e)}")
+            continue
+        queued.append((start is None, start or '', {
+            "event_id": event['id'],
+            "title": event.get('title'),
+            "start_date": start,
+            "tweet": tweet
+        }))
+    queued.sort(key=lambda item: item[:2])
+    _queue = [item for _, _, item in queued]
+    _queue_key = key
+    print(f"Queued {len(_queue)} tweets for upcoming events")
+    return _queue
+
+def pending_tweets(limit: Optional[int] = None) -> List[Dict]:
+    """Queued tweets whose events are not in the posting ledger yet, next first"""
+    ledger = get_ledger()
+    pending = []
+    for item in tweet_queue():
+        if item['event_id'] in ledger:
+            continue
+        pending.append(item)
+        if limit is not None and len(pending) >= limit:
+            break
+    return pending
+
+async def main():
+    bot = get_bot()
     try:
-        bot = XBot()
-        if bot.test_auth():
+        await bot.verify_credentials()
+        if await bot.test_auth():
             print("\nAuthentication test successful! Proceeding with event tweets...")
-            results = bot.post_events(max_events=1)  # Try one tweet first
+            results = await bot.post_events(max_events=1)  # Try one tweet first
             print(json.dumps(results, indent=2))
         else:
             print("\nAuthentication test failed!")
+    finally:
+        await close_bot()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
     except Exception as e:
         print(f"\nError: {str(e)}")
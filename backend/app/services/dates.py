@@ -0,0 +1,221 @@
+import calendar
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Union
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# A yearless date this many days before the reference still counts as this year
+# (e.g. a page crawled in March mentioning "January 20" means this January)
+DATE_PAST_GRACE_DAYS = int(os.getenv("DATE_PAST_GRACE_DAYS", "90"))
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_MONTH = (r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|'
+          r'sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?')
+_DAY = r'(?:[12]\d|3[01]|0?[1-9])(?:st|nd|rd|th)?(?!\d)'
+_YEAR = r'(?:19|20)\d{2}(?!\d)'
+_TO = r'\s*(?:-|–|—|to|until|till|through|thru)\s*'
+_WEEKDAY = r'(?:(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?,?\s+)?'
+
+def _p(pattern: str) -> re.Pattern:
+    return re.compile(pattern.format(M=_MONTH, D=_DAY, Y=_YEAR, TO=_TO, W=_WEEKDAY), re.IGNORECASE)
+
+# Most specific first; matches overlapping an earlier pattern's match are ignored
+PATTERNS: List[Tuple[str, re.Pattern]] = [
+    # 2026-09-12 (to 2026-09-14)
+    ('iso', _p(r'\b(?P<y1>\d{{4}})[-/](?P<m1>\d{{1,2}})[-/](?P<d1>\d{{1,2}})(?!\d)'
+               r'(?:{TO}(?P<y2>\d{{4}})[-/](?P<m2>\d{{1,2}})[-/](?P<d2>\d{{1,2}})(?!\d))?')),
+    # Dec 30, 2025 - Jan 2, 2026 / March 23 - April 2 2026
+    ('mdmd', _p(r'\b{W}(?P<m1>{M})\s+(?P<d1>{D}),?(?:\s+(?P<y1>{Y}))?{TO}{W}(?P<m2>{M})\s+(?P<d2>{D}),?(?:\s+(?P<y2>{Y}))?')),
+    # March 23-26, 2027
+    ('mdd', _p(r'\b(?P<m1>{M})\s+(?P<d1>{D}){TO}(?P<d2>{D}),?(?:\s+(?P<y1>{Y}))?')),
+    # 30 Dec 2025 - 2 Jan 2026
+    ('dmdm', _p(r'\b(?P<d1>{D})\s+(?P<m1>{M}),?(?:\s+(?P<y1>{Y}))?{TO}(?P<d2>{D})\s+(?P<m2>{M}),?(?:\s+(?P<y2>{Y}))?')),
+    # 10-12 December 2025
+    ('ddm', _p(r'\b(?P<d1>{D}){TO}(?P<d2>{D})\s+(?P<m1>{M}),?(?:\s+(?P<y1>{Y}))?')),
+    # Saturday, January 10th, 2026 / December 10
+    ('md', _p(r'\b{W}(?P<m1>{M})\s+(?P<d1>{D}),?(?:\s+(?P<y1>{Y}))?')),
+    # 10 January 2026
+    ('dm', _p(r'\b(?P<d1>{D})\s+(?:of\s+)?(?P<m1>{M}),?(?:\s+(?P<y1>{Y}))?')),
+    # January 2026
+    ('my', _p(r'\b(?P<m1>{M}),?\s+(?P<y1>{Y})')),
+    # 12/05/2026, 12.05.26
+    ('numeric', _p(r'\b(?P<a>\d{{1,2}})[/.-](?P<b>\d{{1,2}})[/.-](?P<y1>\d{{4}}|\d{{2}})(?!\d)')),
+]
+
+def _month(value: str) -> int:
+    return MONTHS[value.lower()[:3]]
+
+def _day(value: str) -> int:
+    return int(re.match(r'\d+', value).group())
+
+def _year(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    year = int(value)
+    return year + 2000 if year < 100 else year
+
+def _reference_date(reference: Union[None, str, date, datetime]) -> date:
+    if reference is None:
+        return date.today()
+    if isinstance(reference, datetime):
+        return reference.date()
+    if isinstance(reference, date):
+        return reference
+    try:
+        return datetime.fromisoformat(str(reference)).date()
+    except ValueError:
+        return date.today()
+
+def _infer_year(month: int, day: int, reference: date, not_before: Optional[date] = None) -> int:
+    """Year of a yearless date: this year unless that is well in the past (or before not_before)"""
+    year = (not_before or reference).year
+    limit = not_before or (reference - timedelta(days=DATE_PAST_GRACE_DAYS))
+    try:
+        if date(year, month, day) < limit:
+            year += 1
+    except ValueError:
+        pass  # e.g. Feb 29 in a non-leap year; left to validation
+    return year
+
+def _make(y: int, m: int, d: int) -> Optional[date]:
+    try:
+        return date(y, m, d)
+    except ValueError:
+        return None
+
+def _resolve(kind: str, match: re.Match, reference: date, not_before: Optional[date]) -> Optional[Dict]:
+    g = match.groupdict()
+    inferred = False
+
+    if kind == 'numeric':
+        a, b, y = int(g['a']), int(g['b']), _year(g['y1'])
+        # Month first unless that is impossible (US sites dominate)
+        month, day = (a, b) if a <= 12 else (b, a)
+        start = _make(y, month, day)
+        return start and {'start': start, 'end': start, 'precision': 'day', 'year_inferred': False}
+
+    if kind == 'my':
+        y, m = _year(g['y1']), _month(g['m1'])
+        return {'start': date(y, m, 1), 'end': date(y, m, calendar.monthrange(y, m)[1]),
+                'precision': 'month', 'year_inferred': False}
+
+    if kind == 'iso':
+        start = _make(int(g['y1']), int(g['m1']), int(g['d1']))
+        end = _make(int(g['y2']), int(g['m2']), int(g['d2'])) if g.get('y2') else start
+        return start and end and {'start': start, 'end': end, 'precision': 'day', 'year_inferred': False}
+
+    m1 = _month(g['m1'])
+    m2 = _month(g['m2']) if g.get('m2') else m1
+    d1 = _day(g['d1'])
+    d2 = _day(g['d2']) if g.get('d2') else d1
+    y1, y2 = _year(g.get('y1')), _year(g.get('y2'))
+
+    # A year written once belongs to the whole range ("Dec 30 - Jan 2, 2026")
+    if y1 is None and y2 is not None:
+        y1 = y2 - 1 if (m1, d1) > (m2, d2) else y2
+    if y1 is None:
+        y1 = _infer_year(m1, d1, reference, not_before)
+        inferred = True
+    if y2 is None:
+        y2 = y1 + 1 if (m1, d1) > (m2, d2) else y1
+
+    start, end = _make(y1, m1, d1), _make(y2, m2, d2)
+    if not start or not end or end < start:
+        return None
+    return {'start': start, 'end': end, 'precision': 'day', 'year_inferred': inferred}
+
+def find_dates(text: str, reference=None, not_before: Optional[date] = None) -> List[Dict]:
+    """
+    Every date or date range in a text, normalized
+
+    Args:
+        text: Free text (page text or an LLM date field)
+        reference: Crawl time (datetime, date or ISO string) for yearless dates
+        not_before: Yearless dates resolve to on or after this date
+
+    Returns:
+        Dicts with text, start_iso, end_iso, precision ('day' or 'month')
+        and year_inferred, in order of appearance
+    """
+    if not text or not isinstance(text, str):
+        return []
+    reference_date = _reference_date(reference)
+    taken: List[Tuple[int, int]] = []
+    found = []
+    for kind, pattern in PATTERNS:
+        for match in pattern.finditer(text):
+            span = match.span()
+            if any(span[0] < end and start < span[1] for start, end in taken):
+                continue
+            resolved = _resolve(kind, match, reference_date, not_before)
+            if resolved is None:
+                continue
+            taken.append(span)
+            found.append((span[0], {
+                'text': match.group().strip(),
+                'start_iso': resolved['start'].isoformat(),
+                'end_iso': resolved['end'].isoformat(),
+                'precision': resolved['precision'],
+                'year_inferred': resolved['year_inferred']
+            }))
+    return [item for _, item in sorted(found, key=lambda pair: pair[0])]
+
+def parse_range(text, reference=None, not_before: Optional[date] = None) -> Optional[Dict]:
+    """The first date or date range in a text, normalized (see find_dates), or None"""
+    found = find_dates(text, reference, not_before)
+    return found[0] if found else None
+
+def normalize_event_date(date_info, reference=None) -> Dict:
+    """
+    ISO start/end for an event's date field
+
+    Accepts the LLM's {"start", "end"} dict or a plain string. The start
+    text may itself be a range; an end without a year is placed on or
+    after the start.
+
+    Returns:
+        Dict with start_iso, end_iso (None if unknown) and precision
+        ('day', 'month' or 'unknown')
+    """
+    if isinstance(date_info, dict):
+        start_text, end_text = date_info.get('start'), date_info.get('end')
+    else:
+        start_text, end_text = date_info, None
+
+    start = parse_range(start_text, reference)
+    if start is None:
+        return {'start_iso': None, 'end_iso': None, 'precision': 'unknown'}
+    start_day = date.fromisoformat(start['start_iso'])
+    end = parse_range(end_text, reference, not_before=start_day)
+    end_iso = end['end_iso'] if end and end['end_iso'] >= start['start_iso'] else start['end_iso']
+    precisions = {start['precision'], end['precision'] if end else start['precision']}
+    return {
+        'start_iso': start['start_iso'],
+        'end_iso': end_iso,
+        'precision': 'month' if 'month' in precisions else 'day'
+    }
+
+def normalize_event(event: Dict, reference=None) -> Dict:
+    """Store normalized start_iso/end_iso/precision in the event's date dict"""
+    date_info = event.get('date')
+    normalized = normalize_event_date(date_info, reference)
+    if isinstance(date_info, dict):
+        event['date'] = {**date_info, **normalized}
+    else:
+        event['date'] = {'start': date_info or 'unknown', 'end': 'unknown', **normalized}
+    return event
+
+def event_dates(event: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Normalized (start, end) of an event, using stored values when present"""
+    date_info = event.get('date')
+    if isinstance(date_info, dict) and 'start_iso' in date_info:
+        return date_info.get('start_iso'), date_info.get('end_iso')
+    normalized = normalize_event_date(date_info, event.get('crawled_at') or event.get('processed_at'))
+    return normalized['start_iso'], normalized['end_iso']
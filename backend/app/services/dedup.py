@@ -0,0 +1,332 @@
+import json
+import os
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from app.services import dates
+
+load_dotenv()
+
+# Matching thresholds on title similarity (override in .env)
+DEDUP_MATCH_THRESHOLD = float(os.getenv("DEDUP_MATCH_THRESHOLD", "0.8"))
+DEDUP_AMBIGUOUS_THRESHOLD = float(os.getenv("DEDUP_AMBIGUOUS_THRESHOLD", "0.5"))
+# Blocks larger than this are too generic to be worth comparing pairwise
+DEDUP_MAX_BLOCK = int(os.getenv("DEDUP_MAX_BLOCK", "200"))
+# Ambiguous clusters are sent to the LLM in batches of this many clusters...
+DEDUP_USE_LLM = os.getenv("DEDUP_USE_LLM", "true").lower() in ("1", "true", "yes")
+DEDUP_LLM_BATCH_SIZE = int(os.getenv("DEDUP_LLM_BATCH_SIZE", "10"))
+# ...with at most this many batches per run
+DEDUP_LLM_MAX_BATCHES = int(os.getenv("DEDUP_LLM_MAX_BATCHES", "5"))
+# Clusters larger than this are left as they are rather than sent to the LLM
+DEDUP_LLM_MAX_CLUSTER = int(os.getenv("DEDUP_LLM_MAX_CLUSTER", "8"))
+
+# MinHash signature of NUM_BANDS * ROWS_PER_BAND values; titles with
+# Jaccard similarity s share a band with probability 1 - (1 - s^r)^b
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_BANDS * ROWS_PER_BAND)
+]
+
+# Words that say what kind of event it is rather than which event
+TITLE_STOPWORDS = {
+    'the', 'a', 'an', 'of', 'and', 'in', 'at', 'by', 'for', 'on',
+    'hackathon', 'hack', 'conference', 'conf', 'meetup', 'summit', 'event',
+    'annual', 'edition', 'online', 'virtual', 'global'
+}
+ORGANIZER_SUFFIXES = {'inc', 'llc', 'ltd', 'team', 'org', 'foundation', 'community'}
+
+# Fields that do not count towards completeness when merging
+_META_FIELDS = {'source_url', 'processed_at', 'id'}
+
+def _is_known(value) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', 'unknown', 'n/a', 'none', 'tbd', 'tba')
+    if isinstance(value, (list, dict)):
+        return any(_is_known(v) for v in (value.values() if isinstance(value, dict) else value))
+    return True
+
+def normalize_title(title) -> str:
+    """Lowercase alphanumerics without event-type words, years or spacing"""
+    words = re.findall(r'[a-z0-9]+', str(title or '').lower())
+    kept = [w for w in words if w not in TITLE_STOPWORDS and not re.fullmatch(r'(19|20)\d\d', w)]
+    return ''.join(kept or words)
+
+def normalize_organizer(organizer) -> Optional[str]:
+    if not _is_known(organizer):
+        return None
+    words = re.findall(r'[a-z0-9]+', str(organizer).lower())
+    words = [w for w in words if w not in ORGANIZER_SUFFIXES and w != 'the']
+    return ''.join(words) or None
+
+def date_range(event: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Normalized (start, end) ISO dates of an event, None where unknown"""
+    start, end = dates.event_dates(event)
+    return start, end or start
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def minhash(items: Iterable[str]) -> List[int]:
+    hashed = [zlib.crc32(item.encode('utf-8')) for item in items]
+    if not hashed:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashed) for a, b in _PERMUTATIONS]
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+        self.parent[max(root_i, root_j)] = min(root_i, root_j)
+        return True
+
+    def groups(self) -> List[List[int]]:
+        members = defaultdict(list)
+        for i in range(len(self.parent)):
+            members[self.find(i)].append(i)
+        return list(members.values())
+
+class _Features:
+    """Per-event values used for blocking and comparison, computed once"""
+
+    def __init__(self, event: Dict):
+        self.title = normalize_title(event.get('title'))
+        self.shingles = shingles(self.title)
+        self.organizer = normalize_organizer(event.get('organizer'))
+        self.start, self.end = date_range(event)
+
+def _dates_compatible(a: _Features, b: _Features) -> Optional[bool]:
+    """True if the date ranges overlap, False if they conflict, None if either is unknown"""
+    if not a.start or not b.start:
+        return None
+    return a.start <= b.end and b.start <= a.end
+
+def candidate_pairs(features: List[_Features]) -> Set[Tuple[int, int]]:
+    """
+    Pairs worth comparing, found by blocking instead of all-pairs
+
+    Events share a block when they have the same organizer and start month,
+    or when their title MinHash signatures agree on a band (LSH). Only events
+    within a block are compared, so the work grows with block sizes rather
+    than with the square of the corpus.
+    """
+    blocks: Dict[Tuple, List[int]] = defaultdict(list)
+    for i, feature in enumerate(features):
+        if feature.start and feature.organizer:
+            blocks[('organizer', feature.organizer, feature.start[:7])].append(i)
+        signature = minhash(feature.shingles)
+        for band in range(NUM_BANDS if signature else 0):
+            rows = tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+            blocks[('band', band, rows)].append(i)
+
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > DEDUP_MAX_BLOCK:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pairs.add((members[x], members[y]))
+    return pairs
+
+def classify_pair(a: _Features, b: _Features) -> str:
+    """'match', 'ambiguous' or 'distinct' for two events"""
+    if _dates_compatible(a, b) is False:
+        return 'distinct'  # e.g. two editions of the same series
+    similarity = jaccard(a.shingles, b.shingles)
+    if similarity >= DEDUP_MATCH_THRESHOLD:
+        return 'match'
+    if similarity >= DEDUP_AMBIGUOUS_THRESHOLD:
+        same_organizer = a.organizer and a.organizer == b.organizer
+        if same_organizer and _dates_compatible(a, b):
+            return 'match'
+        return 'ambiguous'
+    return 'distinct'
+
+def _completeness(event: Dict) -> int:
+    return sum(1 for key, value in event.items() if key not in _META_FIELDS and _is_known(value))
+
+def _fill(base, other):
+    """Fill unknown values in base from other, recursing into dicts and merging lists"""
+    if isinstance(base, dict) and isinstance(other, dict):
+        merged = dict(base)
+        for key, value in other.items():
+            merged[key] = _fill(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(base, list) and isinstance(other, list):
+        merged = list(base)
+        seen = {json.dumps(item, sort_keys=True).lower() for item in base}
+        for item in other:
+            marker = json.dumps(item, sort_keys=True).lower()
+            if marker not in seen and _is_known(item):
+                seen.add(marker)
+                merged.append(item)
+        return merged
+    return base if _is_known(base) else other
+
+def merge_events(events: List[Dict]) -> Dict:
+    """Merge duplicates, starting from the most complete one"""
+    ordered = sorted(events, key=_completeness, reverse=True)
+    merged = ordered[0]
+    for event in ordered[1:]:
+        merged = _fill(merged, event)
+    return merged
+
+def _summary(event: Dict) -> Dict:
+    """Short form of an event for the LLM (never the whole record)"""
+    date_info = event.get('date') if isinstance(event.get('date'), dict) else {"start": event.get('date')}
+    return {
+        "title": event.get('title'),
+        "date": {"start": date_info.get('start'), "end": date_info.get('end')},
+        "organizer": event.get('organizer'),
+        "mode": event.get('mode'),
+        "source_url": event.get('source_url')
+    }
+
+async def _resolve_with_llm(clusters: List[List[int]], events: List[Dict]) -> List[List[int]]:
+    """
+    Ask the LLM which events in each ambiguous cluster are the same event
+
+    Returns:
+        Groups of event indexes to merge
+    """
+    from app.services.llm import chat_completion, is_json_array
+
+    payload = [
+        {"cluster": c, "events": [{"index": i, **_summary(events[idx])} for i, idx in enumerate(cluster)]}
+        for c, cluster in enumerate(clusters)
+    ]
+    prompt = f"""
+        Each cluster below holds tech events that might be duplicates of each other.
+        For every cluster, group the events that describe the same real event
+        (same event and edition, possibly with slightly different titles or details).
+        Events that are different from all others must not be listed.
+
+        Return ONLY a JSON array like:
+        [{{"cluster": 0, "groups": [[0, 2]]}}]
+
+        Clusters:
+        {json.dumps(payload, indent=2)}
+        """
+
+    response_text = await chat_completion(
+        "You are an expert at identifying duplicate event listings. Always return a valid JSON array.",
+        prompt,
+        validate=is_json_array
+    )
+    json_start = response_text.find('[')
+    json_end = response_text.rfind(']') + 1
+    if json_start < 0 or json_end <= json_start:
+        print("No JSON array found in deduplication response")
+        return []
+    try:
+        answers = json.loads(response_text[json_start:json_end])
+    except json.JSONDecodeError as e:
+        print(f"Error parsing LLM deduplication response: {str(e)}")
+        return []
+
+    merges = []
+    for answer in answers if isinstance(answers, list) else []:
+        if not isinstance(answer, dict) or not isinstance(answer.get('cluster'), int):
+            continue
+        if not 0 <= answer['cluster'] < len(clusters):
+            continue
+        cluster = clusters[answer['cluster']]
+        for group in answer.get('groups') or []:
+            if not isinstance(group, list):
+                continue
+            members = {cluster[i] for i in group if isinstance(i, int) and 0 <= i < len(cluster)}
+            if len(members) > 1:
+                merges.append(sorted(members))
+    return merges
+
+async def deduplicate(events: List[Dict], use_llm: bool = DEDUP_USE_LLM) -> Tuple[List[Dict], Dict]:
+    """
+    Merge duplicate events locally, consulting the LLM only for ambiguous clusters
+
+    1. Block events on start date, organizer and title MinHash bands
+    2. Compare candidate pairs by title shingle similarity and date overlap
+    3. Union sure matches; collect borderline pairs into ambiguous clusters
+    4. Send ambiguous clusters to the LLM in bounded batches
+    5. Merge each final group by field completeness
+
+    Returns:
+        (deduplicated events, statistics)
+    """
+    features = [_Features(event) for event in events]
+    pairs = candidate_pairs(features)
+
+    matches = UnionFind(len(events))
+    ambiguous_pairs = []
+    for i, j in sorted(pairs):
+        verdict = classify_pair(features[i], features[j])
+        if verdict == 'match':
+            matches.union(i, j)
+        elif verdict == 'ambiguous':
+            ambiguous_pairs.append((i, j))
+
+    # Ambiguous clusters are formed over the sure-match groups' representatives
+    ambiguous = UnionFind(len(events))
+    for i, j in ambiguous_pairs:
+        root_i, root_j = matches.find(i), matches.find(j)
+        if root_i != root_j:
+            ambiguous.union(root_i, root_j)
+    clusters = [
+        group for group in ambiguous.groups()
+        if 1 < len(group) <= DEDUP_LLM_MAX_CLUSTER
+    ]
+
+    stats = {
+        "input_events": len(events),
+        "candidate_pairs": len(pairs),
+        "ambiguous_clusters": len(clusters),
+        "llm_batches": 0,
+        "llm_merges": 0
+    }
+
+    if use_llm and clusters:
+        batches = [
+            clusters[start:start + DEDUP_LLM_BATCH_SIZE]
+            for start in range(0, len(clusters), DEDUP_LLM_BATCH_SIZE)
+        ][:DEDUP_LLM_MAX_BATCHES]
+        for batch in batches:
+            try:
+                merges = await _resolve_with_llm(batch, events)
+            except Exception as e:
+                print(f"Error resolving ambiguous duplicates: {str(e)}")
+                continue
+            stats["llm_batches"] += 1
+            for group in merges:
+                for other in group[1:]:
+                    if matches.union(group[0], other):
+                        stats["llm_merges"] += 1
+
+    groups = sorted(matches.groups(), key=lambda group: group[0])
+    deduped = [events[group[0]] if len(group) == 1 else merge_events([events[i] for i in group]) for group in groups]
+    stats["output_events"] = len(deduped)
+    print(f"Deduplication: {stats}")
+    return deduped, stats
@@ -0,0 +1,166 @@
+import asyncio  # For running blocking search clients off the event loop
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Discovery settings (override in .env)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "google").lower()
+SEARCH_STUB_FILE = os.getenv("SEARCH_STUB_FILE", os.path.join("crawled_data", "search_stub.json"))
+SEARCH_CACHE_FILE = os.getenv("SEARCH_CACHE_FILE", os.path.join("crawled_data", "search_cache.json"))
+SEARCH_CACHE_TTL_HOURS = float(os.getenv("SEARCH_CACHE_TTL_HOURS", "12"))
+
+class SearchBackend(ABC):
+    """Interface for search discovery backends"""
+
+    name = "base"
+    # Remote backends are cached and paced; local ones are not
+    remote = True
+
+    @abstractmethod
+    async def search(self, query: str, num_results: int) -> List[str]:
+        """URLs found for a query, best first"""
+
+class GoogleSearchBackend(SearchBackend):
+    """googlesearch-python, run in a worker thread so it never blocks the loop"""
+
+    name = "google"
+
+    async def search(self, query: str, num_results: int) -> List[str]:
+        from googlesearch import search
+        return await asyncio.to_thread(lambda: list(search(query, num_results=num_results)))
+
+class StubSearchBackend(SearchBackend):
+    """
+    Offline backend that serves URLs from a local JSON file
+
+    The file holds either a list of URLs returned for every query, or an
+    object mapping query text to URL lists with an optional "*" fallback.
+    """
+
+    name = "stub"
+    remote = False
+
+    def __init__(self, path: str = SEARCH_STUB_FILE):
+        self.path = path
+
+    async def search(self, query: str, num_results: int) -> List[str]:
+        if not os.path.exists(self.path):
+            print(f"Search stub file not found: {self.path}")
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            stub = json.load(f)
+        if isinstance(stub, dict):
+            urls = stub.get(query, stub.get("*", []))
+        else:
+            urls = stub
+        return list(urls)[:num_results]
+
+def get_search_backend(name: str = SEARCH_BACKEND) -> SearchBackend:
+    """Build the configured search backend"""
+    if name == "stub":
+        return StubSearchBackend()
+    if name == "google":
+        return GoogleSearchBackend()
+    raise ValueError(f"Unknown search backend: {name}")
+
+class SearchCache:
+    """
+    TTL cache of search results keyed by (query, date filter)
+
+    Persisted as a small JSON file so repeated crawls on the same day skip
+    the search engine entirely.
+    """
+
+    def __init__(self, path: str = SEARCH_CACHE_FILE, ttl_hours: float = SEARCH_CACHE_TTL_HOURS):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self._entries: Optional[Dict] = None
+
+    @staticmethod
+    def _key(query: str, date_filter: str) -> str:
+        return json.dumps([query, date_filter])
+
+    def _load(self) -> Dict:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._entries = json.load(f)
+            except Exception as e:
+                print(f"Error loading search cache: {str(e)}")
+        return self._entries
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving search cache: {str(e)}")
+
+    def get(self, query: str, date_filter: str) -> Optional[List[str]]:
+        entry = self._load().get(self._key(query, date_filter))
+        if entry and time.time() - entry["cached_at"] < self.ttl:
+            return entry["urls"]
+        return None
+
+    def put(self, query: str, date_filter: str, urls: List[str]):
+        entries = self._load()
+        now = time.time()
+        # Drop expired entries while we are rewriting the file anyway
+        for key in [k for k, v in entries.items() if now - v["cached_at"] >= self.ttl]:
+            del entries[key]
+        entries[self._key(query, date_filter)] = {"urls": urls, "cached_at": now}
+        self._save()
+
+_backend: Optional[SearchBackend] = None
+_cache = SearchCache()
+
+def set_search_backend(backend: SearchBackend):
+    """Swap the discovery backend (e.g. a StubSearchBackend for offline runs)"""
+    global _backend
+    _backend = backend
+
+async def discover(query: str, date_filter: str = "", num_results: int = 8, use_cache: bool = True,
+                   throttle: Optional[Callable] = None) -> List[str]:
+    """
+    Return search result URLs for a query, served from the TTL cache when fresh
+
+    Args:
+        query: Full search string
+        date_filter: Date filter the query was built with (part of the cache key)
+        num_results: Maximum number of results to request
+        use_cache: Set False to always hit the backend
+        throttle: Optional factory of an async context manager entered only
+            around real backend calls (e.g. a scheduler slot)
+
+    Returns:
+        List of result URLs
+    """
+    global _backend
+    if _backend is None:
+        _backend = get_search_backend()
+    # Local results are free, caching them would only mask edits to the file
+    use_cache = use_cache and _backend.remote
+    if use_cache:
+        cached = _cache.get(query, date_filter)
+        if cached is not None:
+            print(f"Search cache hit: {query}")
+            return cached
+    if throttle is not None and _backend.remote:
+        async with throttle():
+            urls = await _backend.search(query, num_results)
+    else:
+        urls = await _backend.search(query, num_results)
+    # Only cache real answers; an empty list may be a transient block
+    if use_cache and urls:
+        _cache.put(query, date_filter, urls)
+    return urls
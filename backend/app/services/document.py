@@ -0,0 +1,183 @@
+import json
+import os
+import re  # For whitespace cleanup
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup, NavigableString  # For parsing HTML content
+from app.services import dates
+
+# Fast C parser backend
+PARSER = 'lxml'
+
+# Terms that suggest a page is about a hackathon or similar event
+HACKATHON_TERMS = ['hackathon', 'register', 'registration', 'prize',
+                   'deadline', 'submit', 'participate', 'team']
+
+# Elements that never hold event content
+NON_CONTENT_TAGS = ['nav', 'footer', 'header', 'aside', 'iframe']
+
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+LIST_TAGS = {'ul', 'ol', 'dl'}
+# Elements whose content starts and ends a block of text
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'body', 'blockquote', 'pre', 'form',
+    'fieldset', 'figure', 'figcaption', 'address', 'details', 'summary', 'li', 'dd', 'dt',
+    'br', 'hr'
+}
+
+def metadata_path(file_path: str) -> str:
+    """Path of the prepared-text sidecar stored next to an HTML file"""
+    return os.path.splitext(file_path)[0] + '.json'
+
+def load_metadata(file_path: str) -> Optional[Dict]:
+    """Prepared text, title and dates saved at crawl time, or None for older files"""
+    path = metadata_path(file_path)
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Error loading metadata for {file_path}: {str(e)}")
+    return None
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip()
+
+def extract_blocks(element) -> List[Dict]:
+    """
+    Split an element into text blocks that follow the DOM structure
+
+    Headings become {"type": "heading", "level", "text"} blocks, lists and
+    tables one block each (one line per item/row) and the text between block
+    elements {"type": "text"} blocks, so chunking can break at real section
+    boundaries.
+    """
+    blocks: List[Dict] = []
+    buffer: List[str] = []
+
+    def flush():
+        text = _normalize(' '.join(buffer))
+        buffer.clear()
+        if text:
+            blocks.append({'type': 'text', 'text': text})
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if type(child) is NavigableString:  # Skip comments, doctypes etc.
+                    buffer.append(str(child))
+                continue
+            name = child.name
+            if name in HEADING_TAGS:
+                flush()
+                text = _normalize(child.get_text(separator=' '))
+                if text:
+                    blocks.append({'type': 'heading', 'level': HEADING_TAGS[name], 'text': text})
+            elif name in LIST_TAGS:
+                flush()
+                items = []
+                for item in child.find_all(['li', 'dt', 'dd']):
+                    # Nested items get their own line, so keep only this item's own text
+                    own = [text for text in item.find_all(string=True)
+                           if type(text) is NavigableString and text.find_parent(['li', 'dt', 'dd']) is item]
+                    text = _normalize(' '.join(own))
+                    if text:
+                        items.append(f"- {text}")
+                if items:
+                    blocks.append({'type': 'list', 'text': '\n'.join(items)})
+            elif name == 'table':
+                flush()
+                rows = []
+                for row in child.find_all('tr'):
+                    cells = [_normalize(cell.get_text(separator=' ')) for cell in row.find_all(['td', 'th'])]
+                    if any(cells):
+                        rows.append(' | '.join(cells))
+                if rows:
+                    blocks.append({'type': 'table', 'text': '\n'.join(rows)})
+            elif name in BLOCK_TAGS:
+                flush()
+                walk(child)
+                flush()
+            else:
+                walk(child)
+
+    walk(element)
+    flush()
+    return blocks
+
+def blocks_text(blocks: List[Dict]) -> str:
+    """Plain text of a block list, blocks separated by blank lines"""
+    return '\n\n'.join(block['text'] for block in blocks)
+
+def html_blocks(html: str) -> List[Dict]:
+    """Blocks of stored main-content HTML (for documents saved without them)"""
+    soup = BeautifulSoup(html, PARSER)
+    for tag in soup.find_all(['script', 'style', *NON_CONTENT_TAGS]):
+        tag.decompose()
+    return extract_blocks(soup)
+
+def prepare_document(html: str, url: str, crawled_at: str = None) -> Optional[Dict]:
+    """
+    Parse a fetched page once and derive everything later stages need
+
+    Args:
+        html: Raw page HTML
+        url: Source URL (for logging)
+        crawled_at: Crawl time (ISO), the reference for dates without a year
+
+    Returns:
+        Dict with:
+        - relevant: False if the page has no hackathon terms or no content
+        - main_html: Main content element serialized for storage
+        - blocks: Structured text blocks of the main content (navigation etc. removed)
+        - text: Plain text of those blocks
+        - title: Page title
+        - dates_found: Normalized dates and ranges found in the page text
+        or None if the HTML could not be parsed
+    """
+    try:
+        soup = BeautifulSoup(html, PARSER)
+        title = soup.title.string.strip() if soup.title and soup.title.string else url
+
+        # Check for hackathon terms
+        text_content = soup.get_text(separator=' ').lower()
+        if not any(term in text_content for term in HACKATHON_TERMS):
+            print(f"No hackathon terms found in {url}")
+            return {'relevant': False, 'title': title}
+
+        # Clean HTML content
+        for tag in soup.find_all(['script', 'style']):
+            tag.decompose()
+
+        # Try to get main content
+        main_content = (
+            soup.find('main') or
+            soup.find('article') or
+            soup.find('div', {'class': ['content', 'main-content']}) or
+            soup.find('body')
+        )
+        if not main_content:
+            print(f"No main content found in {url}")
+            return {'relevant': False, 'title': title}
+
+        main_html = str(main_content)
+
+        # Strip page chrome from the text handed to the processor
+        for tag in main_content.find_all(NON_CONTENT_TAGS):
+            tag.decompose()
+        blocks = extract_blocks(main_content)
+        text = blocks_text(blocks)
+
+        # Extract dates from the original-case text
+        dates_found = dates.find_dates(text, crawled_at)
+
+        return {
+            'relevant': True,
+            'main_html': main_html,
+            'blocks': blocks,
+            'text': text,
+            'title': title,
+            'dates_found': dates_found
+        }
+    except Exception as e:
+        print(f"Error parsing {url}: {str(e)}")
+        return None
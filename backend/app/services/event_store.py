@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.services import dates
+
+# Event store lives next to the processed results
+EVENTS_DB = os.path.join("processed_results", "events.db")
+RESPONSES_FILE = os.path.join("processed_results", "responses.json")
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# Rows fetched per query when streaming the whole event set
+EXPORT_BATCH_SIZE = 500
+
+# Columns that /results may sort on
+SORT_COLUMNS = {'start_date', 'end_date', 'title', 'event_type', 'mode', 'updated_at'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    event_type TEXT,
+    mode TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    source_url TEXT,
+    updated_at TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events(event_type);
+CREATE INDEX IF NOT EXISTS idx_events_mode ON events(mode);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events(start_date);
+CREATE INDEX IF NOT EXISTS idx_events_source ON events(source_url);
+CREATE INDEX IF NOT EXISTS idx_events_updated ON events(updated_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Created after migrating older stores, which lack end_date. The expression
+# index serves the "upcoming" filter (events that have not ended yet).
+DATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_events_end ON events(end_date);
+CREATE INDEX IF NOT EXISTS idx_events_current ON events(COALESCE(end_date, start_date));
+"""
+
+def _norm(value) -> str:
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+def event_start(event: Dict) -> Optional[str]:
+    """Normalized start date of an event"""
+    return dates.event_dates(event)[0]
+
+def event_end(event: Dict) -> Optional[str]:
+    """Normalized end date of an event (its start date for one-day events)"""
+    return dates.event_dates(event)[1]
+
+def event_id(event: Dict) -> str:
+    """
+    Stable identity of an event across processing runs
+
+    Uses the normalized title plus the normalized start date, falling back
+    to the source URL when the date is unknown.
+    """
+    anchor = event_start(event) or _norm(event.get('source_url') or event.get('url'))
+    return hashlib.sha1(f"{_norm(event.get('title'))}|{anchor}".encode('utf-8')).hexdigest()[:16]
+
+@contextmanager
+def _connect():
+    os.makedirs(os.path.dirname(EVENTS_DB), exist_ok=True)
+    conn = sqlite3.connect(EVENTS_DB)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+_initialized = False
+# In-memory copy of the store version, kept current by replace_events
+_version: Optional[int] = None
+# Callbacks run after every change to the event set (e.g. response cache invalidation)
+_listeners: List[Callable[[int], None]] = []
+
+def on_change(callback: Callable[[int], None]):
+    """Register a write hook called with the new version after each change"""
+    _listeners.append(callback)
+
+def init_store():
+    """Create tables and import responses.json into an empty store (once per process)"""
+    global _initialized
+    if _initialized:
+        return
+    with _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        conn.executescript(DATE_INDEXES)
+        empty = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+    _initialized = True
+    if empty and os.path.exists(RESPONSES_FILE):
+        try:
+            with open(RESPONSES_FILE, 'r', encoding='utf-8') as f:
+                events = json.load(f)
+            print(f"Importing {len(events)} events from {RESPONSES_FILE}")
+            replace_events(events)
+        except Exception as e:
+            print(f"Error importing events: {str(e)}")
+
+def _migrate(conn: sqlite3.Connection):
+    """Add end_date to stores created before it existed, backfilling both date columns"""
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(events)")}
+    if 'end_date' in columns:
+        return
+    print("Migrating event store: adding end_date")
+    with conn:
+        conn.execute("ALTER TABLE events ADD COLUMN end_date TEXT")
+        rows = conn.execute("SELECT id, data FROM events").fetchall()
+        for row in rows:
+            start, end = dates.event_dates(json.loads(row['data']))
+            conn.execute("UPDATE events SET start_date=?, end_date=? WHERE id=?", (start, end, row['id']))
+
+def _row_values(event: Dict, now: str) -> Tuple:
+    start, end = dates.event_dates(event)
+    return (
+        event_id(event),
+        event.get('title'),
+        _norm(event.get('event_type')) or None,
+        _norm(event.get('mode')) or None,
+        start,
+        end,
+        event.get('source_url') or event.get('url'),
+        now,
+        json.dumps(event, sort_keys=True)
+    )
+
+def replace_events(events: List[Dict]) -> Dict:
+    """
+    Make the store hold exactly this event set
+
+    Unchanged events keep their updated_at; changed or new ones are upserted
+    and events missing from the set are marked deleted. Bumps the store
+    version when anything changed.
+    """
+    return _write_events(events, delete_missing=True)
+
+def upsert_events(events: List[Dict]) -> Dict:
+    """
+    Add or update these events, leaving the rest of the store as it is
+
+    Used to publish a document's events as soon as it is processed; the
+    next replace_events settles the deduplicated set. Bumps the store
+    version when anything changed.
+    """
+    if not events:
+        return {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    return _write_events(events, delete_missing=False)
+
+def _write_events(events: List[Dict], delete_missing: bool) -> Dict:
+    global _version
+    init_store()
+    now = datetime.now().isoformat()
+    rows = {}
+    for event in events:
+        values = _row_values(event, now)
+        rows[values[0]] = values
+
+    stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    with _connect() as conn:
+        with conn:
+            if delete_missing:
+                existing = {
+                    row['id']: (row['data'], row['deleted'])
+                    for row in conn.execute("SELECT id, data, deleted FROM events")
+                }
+            else:
+                # Only the rows being written matter
+                existing = {}
+                for eid in rows:
+                    row = conn.execute("SELECT data, deleted FROM events WHERE id=?", (eid,)).fetchone()
+                    if row is not None:
+                        existing[eid] = (row['data'], row['deleted'])
+            for eid, values in rows.items():
+                previous = existing.get(eid)
+                if previous is not None and previous[0] == values[-1] and not previous[1]:
+                    stats["unchanged"] += 1
+                    continue
+                stats["inserted" if previous is None else "updated"] += 1
+                conn.execute(
+                    """INSERT INTO events (id, title, event_type, mode, start_date, end_date, source_url,
+                                          updated_at, data, deleted)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                       ON CONFLICT(id) DO UPDATE SET
+                           title=excluded.title, event_type=excluded.event_type, mode=excluded.mode,
+                           start_date=excluded.start_date, end_date=excluded.end_date,
+                           source_url=excluded.source_url,
+                           updated_at=excluded.updated_at, data=excluded.data, deleted=0""",
+                    values
+                )
+            if delete_missing:
+                for eid, (_, deleted) in existing.items():
+                    if eid not in rows and not deleted:
+                        conn.execute("UPDATE events SET deleted=1, updated_at=? WHERE id=?", (now, eid))
+                        stats["deleted"] += 1
+            changed = stats["inserted"] or stats["updated"] or stats["deleted"]
+            if changed:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('version', '1') "
+                    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+                )
+                version = int(conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()[0])
+    print(f"Event store: {stats}")
+    if changed:
+        _version = version
+        for callback in _listeners:
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Error in event store listener: {str(e)}")
+    return stats
+
+def get_version() -> int:
+    """Counter bumped on every change to the event set (read from disk once per process)"""
+    global _version
+    init_store()
+    if _version is None:
+        with _connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key='version'").fetchone()
+        _version = int(row['value']) if row else 0
+    return _version
+
+def _filters(event_type: Optional[str] = None, mode: Optional[str] = None,
+             source_url: Optional[str] = None, start_after: Optional[str] = None,
+             start_before: Optional[str] = None, upcoming: bool = False,
+             include_deleted: bool = False) -> Tuple[str, List]:
+    clauses, params = ([] if include_deleted else ["deleted = 0"]), []
+    if event_type:
+        clauses.append("event_type = ?")
+        params.append(_norm(event_type))
+    if mode:
+        clauses.append("mode = ?")
+        params.append(_norm(mode))
+    if source_url:
+        clauses.append("source_url = ?")
+        params.append(source_url)
+    if start_after:
+        clauses.append("start_date >= ?")
+        params.append(start_after)
+    if start_before:
+        clauses.append("start_date <= ?")
+        params.append(start_before)
+    if upcoming:
+        # Not ended yet; matches the idx_events_current expression index
+        clauses.append("COALESCE(end_date, start_date) >= ?")
+        params.append(date.today().isoformat())
+    return " AND ".join(clauses) or "1", params
+
+def _project(row: sqlite3.Row, fields: Optional[List[str]]) -> Dict:
+    event = json.loads(row['data'])
+    event['id'] = row['id']
+    if fields:
+        event = {key: event[key] for key in ['id', *fields] if key in event}
+    return event
+
+def query_events(event_type: Optional[str] = None, mode: Optional[str] = None,
+                 source_url: Optional[str] = None, start_after: Optional[str] = None,
+                 start_before: Optional[str] = None, upcoming: bool = False,
+                 sort: str = 'start_date', order: str = 'asc',
+                 limit: int = DEFAULT_LIMIT, offset: int = 0,
+                 fields: Optional[List[str]] = None) -> Tuple[List[Dict], int]:
+    """
+    Filter, sort and page through events using the store's indexes
+
+    Returns:
+        (events on this page, total matching events)
+    """
+    init_store()
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort}")
+    direction = 'DESC' if order.lower() == 'desc' else 'ASC'
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = max(0, offset)
+    where, params = _filters(event_type, mode, source_url, start_after, start_before, upcoming)
+
+    with _connect() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM events WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT id, data FROM events WHERE {where} "
+            f"ORDER BY {sort} IS NULL, {sort} {direction}, id LIMIT ? OFFSET ?",
+            [*params, limit, offset]
+        ).fetchall()
+    return [_project(row, fields) for row in rows], total
+
+def iter_events(event_type: Optional[str] = None, mode: Optional[str] = None,
+                source_url: Optional[str] = None, start_after: Optional[str] = None,
+                start_before: Optional[str] = None, upcoming: bool = False,
+                updated_since: Optional[str] = None, since_id: Optional[str] = None,
+                fields: Optional[List[str]] = None,
+                batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Yield every matching event in (updated_at, id) order with bounded memory
+
+    Rows are read in batches using keyset pagination on the updated_at
+    index, so each batch is one short indexed query. Every event carries its
+    updated_at, which a client passes back as `updated_since` to fetch only
+    changes strictly after it; such incremental reads also include events
+    deleted since then, as {"id", "updated_at", "deleted": true} tombstones.
+    Many events share an updated_at, so a client resuming from the middle of
+    an interrupted stream also passes the last id it received as `since_id`,
+    making the cursor the strict (updated_at, id) position after that row.
+    """
+    init_store()
+    incremental = bool(updated_since)
+    where, params = _filters(event_type, mode, source_url, start_after, start_before, upcoming,
+                             include_deleted=incremental)
+    # (updated_at, id) of the last row already sent; id None means the whole timestamp was sent
+    cursor = (updated_since, since_id) if incremental else None
+
+    while True:
+        clauses, batch_params = [where], list(params)
+        if cursor and cursor[1] is None:
+            clauses.append("updated_at > ?")
+            batch_params.append(cursor[0])
+        elif cursor:
+            clauses.append("(updated_at > ? OR (updated_at = ? AND id > ?))")
+            batch_params.extend([cursor[0], cursor[0], cursor[1]])
+        with _connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, data, updated_at, deleted FROM events WHERE {' AND '.join(clauses)} "
+                f"ORDER BY updated_at, id LIMIT ?",
+                [*batch_params, batch_size]
+            ).fetchall()
+        for row in rows:
+            if row['deleted']:
+                yield {"id": row['id'], "updated_at": row['updated_at'], "deleted": True}
+            else:
+                event = _project(row, fields)
+                event['updated_at'] = row['updated_at']
+                yield event
+        if len(rows) < batch_size:
+            return
+        cursor = (rows[-1]['updated_at'], rows[-1]['id'])
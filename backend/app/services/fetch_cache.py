@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FETCH_CACHE_FILE = os.getenv("FETCH_CACHE_FILE", os.path.join("crawled_data", "fetch_cache.json"))
+
+def cache_key(url: str) -> str:
+    """Normalized URL used as the cache key (lowercase scheme/host, no fragment)"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, ''))
+
+def body_hash(content: str) -> str:
+    """Hash of a response body, used to detect unchanged pages without validators"""
+    return hashlib.sha256(content.encode('utf-8', errors='replace')).hexdigest()
+
+class FetchCache:
+    """
+    Validators and body hashes from previous fetches, keyed by normalized URL
+
+    `conditional_headers` turns a stored ETag/Last-Modified into
+    If-None-Match/If-Modified-Since, and `is_unchanged` compares a fresh
+    body hash with the stored one. Call `save` once per crawl.
+    """
+
+    def __init__(self, path: str = FETCH_CACHE_FILE):
+        self.path = path
+        self._entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self.hits = 0
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+        except Exception as e:
+            print(f"Error loading fetch cache: {str(e)}")
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self._entries.get(cache_key(url))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Headers for a conditional GET, empty if nothing is stored"""
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        """True if the stored body hash matches this body"""
+        entry = self.get(url)
+        return bool(entry and entry.get('body_hash') == digest)
+
+    def mark_hit(self, url: str):
+        """Record that a page was confirmed unchanged"""
+        self.hits += 1
+        entry = self.get(url)
+        if entry:
+            entry['checked_at'] = datetime.now().isoformat()
+            self._dirty = True
+
+    def update(self, url: str, digest: str, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, file_path: Optional[str] = None):
+        """Store validators and body hash after a full fetch (file_path is None for rejected pages)"""
+        now = datetime.now().isoformat()
+        self._entries[cache_key(url)] = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': digest,
+            'file_path': file_path,
+            'fetched_at': now,
+            'checked_at': now
+        }
+        self._dirty = True
+
+    def save(self):
+        """Persist the cache atomically if anything changed"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except Exception as e:
+            print(f"Error saving fetch cache: {str(e)}")
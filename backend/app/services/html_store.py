@@ -0,0 +1,319 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from app.services.document import load_metadata, metadata_path
+
+load_dotenv()
+
+# Storage settings (override in .env)
+HTML_STORAGE = os.getenv("HTML_STORAGE", "files").lower()
+PACK_MAX_BYTES = int(os.getenv("PACK_MAX_BYTES", str(64 * 1024 * 1024)))
+PACK_COMPRESSION_LEVEL = int(os.getenv("PACK_COMPRESSION_LEVEL", "6"))
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, 'crawled_data')
+
+def content_hash(content: bytes) -> str:
+    """Stable hash of a document's bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+class HtmlStore(ABC):
+    """
+    Interface for crawled HTML storage
+
+    Documents are identified by a store-specific `doc_id`. Each listing entry
+    carries the document's content hash so callers can detect changes
+    without reading the document.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def save(self, url: str, content: str, metadata: Dict = None) -> Optional[str]:
+        """Store a page's main HTML and prepared metadata, returning its doc_id"""
+
+    @abstractmethod
+    def list_documents(self, known: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        """
+        Entries with doc_id, url and content_hash for every current document
+
+        `known` maps doc_id to a previous entry (e.g. from the processing
+        manifest); stores that hash on listing reuse its content_hash when
+        the document's size and mtime are unchanged.
+        """
+
+    @abstractmethod
+    def read(self, doc_id: str) -> Optional[Dict]:
+        """Dict with url, html, metadata (None if no sidecar) and saved_at for one document"""
+
+    def count(self) -> int:
+        return len(self.list_documents())
+
+    @abstractmethod
+    def digest(self, doc_id: str) -> Optional[str]:
+        """Content hash of one document, as reported by list_documents"""
+
+    def path_of(self, doc_id: str) -> Optional[str]:
+        """Filesystem path of a document, if it has one of its own"""
+        return None
+
+    def file_stat(self, doc_id: str) -> Optional[Dict]:
+        """Size and mtime_ns of a document's own file, for stores listing by hashing"""
+        return None
+
+    @abstractmethod
+    def version(self):
+        """Cheap token that changes whenever documents are added or removed"""
+
+class FileHtmlStore(HtmlStore):
+    """One timestamped .html file (plus JSON sidecar) per fetch"""
+
+    name = "files"
+
+    def __init__(self, html_dir: str = os.path.join(DATA_DIR, 'html')):
+        self.html_dir = html_dir
+        os.makedirs(self.html_dir, exist_ok=True)
+
+    def save(self, url: str, content: str, metadata: Dict = None) -> Optional[str]:
+        # Create a safe filename from URL
+        safe_filename = re.sub(r'[^a-zA-Z0-9]', '_', url.split('//')[-1])
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"hackathon_{timestamp}_{safe_filename[:50]}.html"
+        file_path = os.path.join(self.html_dir, filename)
+
+        # Write the sidecar first so the processor never sees HTML without it
+        if metadata is not None:
+            with open(metadata_path(file_path), 'w', encoding='utf-8') as f:
+                json.dump({'url': url, **metadata}, f)
+
+        # Write content to file
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(f"Source URL: {url}\n\n")
+            f.write(content)
+        return filename
+
+    def list_documents(self, known: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        documents = []
+        known = known or {}
+        for entry in os.scandir(self.html_dir):
+            if not entry.name.endswith('.html'):
+                continue
+            stat = entry.stat()
+            previous = known.get(entry.name) or {}
+            if (previous.get('content_hash') and previous.get('size') == stat.st_size
+                    and previous.get('mtime_ns') == stat.st_mtime_ns):
+                # Unchanged since it was last hashed
+                digest = previous['content_hash']
+            else:
+                with open(entry.path, 'rb') as f:
+                    digest = content_hash(f.read())
+            documents.append({"doc_id": entry.name, "url": None, "content_hash": digest,
+                              "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        return documents
+
+    def read(self, doc_id: str) -> Optional[Dict]:
+        file_path = self.path_of(doc_id)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        first_line, _, html = content.partition('\n')
+        return {
+            "url": first_line.replace('Source URL: ', '').strip(),
+            "html": html.lstrip('\n'),
+            "metadata": load_metadata(file_path),
+            "saved_at": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+        }
+
+    def digest(self, doc_id: str) -> Optional[str]:
+        file_path = self.path_of(doc_id)
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return content_hash(f.read())
+
+    def file_stat(self, doc_id: str) -> Optional[Dict]:
+        try:
+            stat = os.stat(self.path_of(doc_id))
+        except OSError:
+            return None
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def count(self) -> int:
+        # Counting does not need content hashes
+        return sum(1 for entry in os.scandir(self.html_dir) if entry.name.endswith('.html'))
+
+    def path_of(self, doc_id: str) -> Optional[str]:
+        return os.path.join(self.html_dir, doc_id)
+
+    def version(self):
+        # Directory mtime changes on every file create/delete
+        return os.stat(self.html_dir).st_mtime_ns
+
+class PackHtmlStore(HtmlStore):
+    """
+    Compressed, append-only pack files with an offset index
+
+    Each record is a zlib-compressed JSON object ({url, html, metadata})
+    appended to the current `pack-NNNNN.pack`. `index.jsonl` gets one line
+    per record with its pack, offset, length, canonical URL and content
+    hash, written only after the record is flushed, so a torn write leaves
+    at most an unreferenced tail. The latest record per URL is the live
+    document, so doc_id is the canonical URL. Readers memory-map the packs
+    and decompress a single record without scanning.
+
+    `save` may run in worker threads: appends are serialized by a write
+    lock, and readers on the event loop only wait for the brief index
+    update, never for a write or fsync.
+    """
+
+    name = "pack"
+
+    def __init__(self, pack_dir: str = os.path.join(DATA_DIR, 'packs'), max_pack_bytes: int = PACK_MAX_BYTES):
+        self.pack_dir = pack_dir
+        self.max_pack_bytes = max_pack_bytes
+        self.index_file = os.path.join(pack_dir, 'index.jsonl')
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self._latest: Dict[str, Dict] = {}
+        self._index_offset = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._index_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refresh_index()
+
+    def _refresh_index(self):
+        """Read index lines appended since the last refresh (by any process)"""
+        if not os.path.exists(self.index_file):
+            return
+        with self._index_lock, open(self.index_file, 'rb') as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partially written line; pick it up next time
+                self._index_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._latest[entry['url']] = entry
+
+    def _current_pack(self) -> str:
+        packs = sorted(name for name in os.listdir(self.pack_dir) if name.endswith('.pack'))
+        if packs:
+            latest = packs[-1]
+            if os.path.getsize(os.path.join(self.pack_dir, latest)) < self.max_pack_bytes:
+                return latest
+            number = int(latest[len('pack-'):-len('.pack')]) + 1
+        else:
+            number = 1
+        return f"pack-{number:05d}.pack"
+
+    def save(self, url: str, content: str, metadata: Dict = None) -> Optional[str]:
+        digest = content_hash(content.encode('utf-8'))
+        self._refresh_index()
+        latest = self._latest.get(url)
+        if latest and latest['content_hash'] == digest:
+            return url  # Identical content is already stored
+        # Compress before taking the lock so threads only queue for the append
+        record = zlib.compress(
+            json.dumps({"url": url, "html": content, "metadata": metadata}).encode('utf-8'),
+            PACK_COMPRESSION_LEVEL
+        )
+        with self._write_lock:
+            self._refresh_index()
+            latest = self._latest.get(url)
+            if latest and latest['content_hash'] == digest:
+                return url  # Saved by another thread meanwhile
+
+            pack = self._current_pack()
+            with open(os.path.join(self.pack_dir, pack), 'ab') as f:
+                offset = f.tell()
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = {
+                "url": url,
+                "content_hash": digest,
+                "pack": pack,
+                "offset": offset,
+                "length": len(record),
+                "saved_at": datetime.now().isoformat()
+            }
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            return url
+
+    def list_documents(self, known: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+        # Hashes come from the index, so there is nothing to reuse
+        self._refresh_index()
+        return [
+            {"doc_id": url, "url": url, "content_hash": entry['content_hash']}
+            for url, entry in self._latest.items()
+        ]
+
+    def _map(self, pack: str, end: int) -> mmap.mmap:
+        mapped = self._maps.get(pack)
+        if mapped is None or len(mapped) < end:
+            # The pack grew since it was mapped; remap to cover the new records
+            if mapped is not None:
+                mapped.close()
+            with open(os.path.join(self.pack_dir, pack), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[pack] = mapped
+        return mapped
+
+    def read(self, doc_id: str) -> Optional[Dict]:
+        entry = self._latest.get(doc_id)
+        if entry is None:
+            self._refresh_index()
+            entry = self._latest.get(doc_id)
+            if entry is None:
+                return None
+        end = entry['offset'] + entry['length']
+        mapped = self._map(entry['pack'], end)
+        record = json.loads(zlib.decompress(mapped[entry['offset']:end]))
+        record["saved_at"] = entry.get("saved_at")
+        return record
+
+    def digest(self, doc_id: str) -> Optional[str]:
+        self._refresh_index()
+        entry = self._latest.get(doc_id)
+        return entry['content_hash'] if entry else None
+
+    def count(self) -> int:
+        self._refresh_index()
+        return len(self._latest)
+
+    def version(self):
+        # The index only ever grows, so its size identifies the store state
+        return os.path.getsize(self.index_file) if os.path.exists(self.index_file) else 0
+
+    def close(self):
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps = {}
+
+_store: Optional[HtmlStore] = None
+
+def get_html_store() -> HtmlStore:
+    """Return the process-wide HTML store selected by HTML_STORAGE"""
+    global _store
+    if _store is None:
+        if HTML_STORAGE == "pack":
+            _store = PackHtmlStore()
+        elif HTML_STORAGE == "files":
+            _store = FileHtmlStore()
+        else:
+            raise ValueError(f"Unknown HTML storage backend: {HTML_STORAGE}")
+    return _store
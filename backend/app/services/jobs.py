@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.services import pipeline_stats
+
+load_dotenv()
+
+# Finished jobs are appended here, one JSON object per line
+JOBS_HISTORY_FILE = os.path.join("processed_results", "jobs.jsonl")
+# Jobs kept in memory for GET /jobs (older ones stay in the history file)
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "100"))
+# Kinds in the same group share data files (manifest, results, fetch cache),
+# so at most one job per group runs at a time
+JOB_GROUPS = {"crawl": "ingest", "process": "ingest", "pipeline": "ingest"}
+
+class Job:
+    """One background run of a pipeline stage (e.g. crawl or process)"""
+
+    def __init__(self, kind: str, params: Dict = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params or {}
+        self.status = "running"
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.coalesced = 0
+        self._started = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def matches(self, kind: str, params: Dict) -> bool:
+        """Whether a trigger of this kind and params would do what this job does"""
+        return kind == self.kind and params == self.params
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    def to_dict(self) -> Dict:
+        job = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": self.duration_seconds,
+            "coalesced_triggers": self.coalesced,
+            "result": self.result,
+            "error": self.error
+        }
+        if not self.done:
+            # Live per-stage progress comes from the pipeline counters
+            job["progress"] = pipeline_stats.get_stats()["in_flight"].get(self.kind)
+        return job
+
+class JobManager:
+    """
+    Runs pipeline stages as background asyncio tasks
+
+    At most one job per group (see JOB_GROUPS; other kinds form their own
+    group) runs at a time: triggering any kind of a group with a running
+    job returns that job instead of starting another, e.g. a crawl
+    triggered during a pipeline run does not crawl again afterwards.
+    Finished jobs are appended to a JSONL history with their duration and
+    outcome.
+    """
+
+    def __init__(self, history_file: str = JOBS_HISTORY_FILE, history_limit: int = JOB_HISTORY_LIMIT):
+        self.history_file = history_file
+        self.history_limit = history_limit
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._history: "OrderedDict[str, Dict]" = OrderedDict()
+        self._active: Dict[str, Job] = {}
+        self._load_history()
+
+    def _load_history(self):
+        if not os.path.exists(self.history_file):
+            return
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line
+                    self._history[entry['id']] = entry
+                    while len(self._history) > self.history_limit:
+                        self._history.popitem(last=False)
+        except Exception as e:
+            print(f"Error loading job history: {str(e)}")
+
+    def _record(self, job: Job):
+        entry = job.to_dict()
+        try:
+            os.makedirs(os.path.dirname(self.history_file) or '.', exist_ok=True)
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        except Exception as e:
+            print(f"Error saving job history: {str(e)}")
+        self._history[job.id] = entry
+        while len(self._history) > self.history_limit:
+            self._history.popitem(last=False)
+
+    def submit(self, kind: str, runner: Callable[[], Awaitable[Dict]], **params) -> Tuple[Job, bool]:
+        """
+        Start a job unless one of the same group is running
+
+        Args:
+            kind: Job kind; one job per group runs at a time
+            runner: Coroutine function doing the work, returning a result dict
+            params: Trigger parameters, recorded with the job
+
+        Returns:
+            (job, created) where created is False if the trigger was
+            coalesced; the running job may then differ in kind or params
+            (see Job.matches)
+        """
+        group = JOB_GROUPS.get(kind, kind)
+        active = self._active.get(group)
+        if active is not None and not active.done:
+            active.coalesced += 1
+            print(f"Coalescing {kind} trigger onto running {active.kind} job {active.id}")
+            return active, False
+
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        self._active[group] = job
+        job._task = asyncio.create_task(self._run(job, runner))
+        print(f"Started {kind} job {job.id}")
+        return job, True
+
+    async def _run(self, job: Job, runner: Callable[[], Awaitable[Dict]]):
+        try:
+            job.result = await runner()
+            if isinstance(job.result, dict) and job.result.get("status") == "error":
+                job.status = "error"
+                job.error = job.result.get("message")
+            else:
+                job.status = "success"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            print(f"Error in {job.kind} job {job.id}: {str(e)}")
+            job.status = "error"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            job.duration_seconds = round(time.monotonic() - job._started, 2)
+            group = JOB_GROUPS.get(job.kind, job.kind)
+            if self._active.get(group) is job:
+                del self._active[group]
+            self._record(job)
+            self._jobs.pop(job.id, None)
+            print(f"{job.kind} job {job.id} finished: {job.status} in {job.duration_seconds}s")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._history.get(job_id)
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        """Running jobs first, then the most recent finished ones"""
+        running = [job.to_dict() for job in reversed(self._jobs.values())]
+        finished = list(reversed(self._history.values()))
+        return (running + finished)[:max(0, limit)]
+
+    async def wait(self, job_id: str) -> Optional[Dict]:
+        """Wait for a running job to finish and return its final state"""
+        job = self._jobs.get(job_id)
+        if job is not None and job._task is not None:
+            await asyncio.shield(asyncio.wait([job._task]))
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation of a running job"""
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job._task is None:
+            return False
+        print(f"Cancelling {job.kind} job {job.id}")
+        job._task.cancel()
+        return True
+
+    async def shutdown(self):
+        """Cancel running jobs and wait until they have recorded their outcome"""
+        tasks = [job._task for job in self._jobs.values() if job._task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+_manager: Optional[JobManager] = None
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager"""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+# First line of every log in the batch-commit format
+LOG_HEADER = {"_jsonl_log": 2}
+# Key of the line closing each batch; its value is the batch's record count
+COMMIT_KEY = "_commit"
+
+class JsonlLog:
+    """
+    Append-only JSONL log of records with an in-memory index by key
+
+    Each line is one record; a later line for the same key supersedes
+    earlier ones. Appending N records writes N lines, so cost is O(N)
+    rather than O(history). A batch is written as its records followed by
+    a commit line ({"_commit": N}) and fsynced once, and loading applies a
+    batch only when its commit line is present and matches, so a batch is
+    either fully in the log or not at all. An uncommitted tail left by a
+    crash is discarded (and truncated away) on the next load.
+    `compact` rewrites the log with live records only, via a temp file and
+    an atomic rename; it runs automatically once the log holds
+    `compact_ratio` lines per live key and at least `compact_min_lines`.
+
+    Appends are serialized by a lock, so they may run in worker threads
+    (e.g. via asyncio.to_thread) to keep the fsync off the event loop.
+    Logs written before the commit format are read as fully committed and
+    rewritten in it on first load.
+    """
+
+    def __init__(self, path: str, key_fn: Callable[[Dict], str],
+                 compact_ratio: float = 2.0, compact_min_lines: int = 1000):
+        self.path = path
+        self.key_fn = key_fn
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+        self._records: Optional[Dict[str, Dict]] = None
+        self._lines = 0
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Dict]:
+        with self._lock:
+            if self._records is not None:
+                return self._records
+            self._records = {}
+            self._lines = 0
+
+            if not os.path.exists(self.path):
+                self._seed()
+                return self._records
+
+            legacy = None
+            batch: List[Dict] = []
+            offset = committed_offset = 0
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Skipping unreadable line in {self.path}")
+                        record = None
+                    if legacy is None:
+                        legacy = record != LOG_HEADER
+                        if not legacy:
+                            committed_offset = offset
+                            continue
+                    if legacy:
+                        # Old format: every complete line was written durably on its own
+                        if record is not None:
+                            self._apply([record])
+                        committed_offset = offset
+                    elif isinstance(record, dict) and COMMIT_KEY in record:
+                        if record[COMMIT_KEY] == len(batch) and None not in batch:
+                            self._apply(batch)
+                        else:
+                            print(f"Discarding a damaged batch in {self.path}")
+                        batch = []
+                        committed_offset = offset
+                    else:
+                        # Unreadable lines are kept as None, which fails the batch
+                        batch.append(record)
+            if committed_offset < os.path.getsize(self.path):
+                # Drop an uncommitted batch or torn line left by a crash mid-append
+                print(f"Truncating uncommitted tail of {self.path} at byte {committed_offset}")
+                with open(self.path, 'r+b') as f:
+                    f.truncate(committed_offset)
+            if legacy:
+                print(f"Migrating {self.path} to batch commits")
+                self.compact()
+            return self._records
+
+    def _apply(self, records: List[Dict]):
+        for record in records:
+            self._records[self.key_fn(record)] = record
+            self._lines += 1
+
+    def _seed(self):
+        """Fill a missing log (e.g. from an older format); nothing by default"""
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._load()
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def records(self) -> List[Dict]:
+        return list(self._load().values())
+
+    def append(self, records: List[Dict]) -> int:
+        """
+        Append records to the log as one atomic batch
+
+        The batch is durable once this returns; after a crash before that,
+        none of it is visible on the next load.
+
+        Returns:
+            Number of records whose key was not in the index before
+        """
+        with self._lock:
+            index = self._load()
+            if not records:
+                return 0
+            new_count = sum(1 for key in {self.key_fn(record) for record in records} if key not in index)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                start = f.tell()
+                try:
+                    if start == 0:
+                        f.write(json.dumps(LOG_HEADER) + '\n')
+                    for record in records:
+                        f.write(json.dumps(record) + '\n')
+                    f.write(json.dumps({COMMIT_KEY: len(records)}) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    # Never leave a partial batch in front of the next one
+                    f.truncate(start)
+                    raise
+            self._apply(records)
+
+            if self._lines >= self.compact_min_lines and self._lines > self.compact_ratio * len(index):
+                self.compact()
+            return new_count
+
+    def compact(self):
+        """Rewrite the log with only the latest record per key, as one committed batch"""
+        with self._lock:
+            index = self._load()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(LOG_HEADER) + '\n')
+                for record in index.values():
+                    f.write(json.dumps(record) + '\n')
+                f.write(json.dumps({COMMIT_KEY: len(index)}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            print(f"Compacted {self.path} from {self._lines} to {len(index)} lines")
+            self._lines = len(index)
@@ -0,0 +1,143 @@
+import asyncio  # For concurrency limits and rate-limit waits
+import json
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+import openai
+from openai import AsyncOpenAI
+from app.services import llm_cache
+
+load_dotenv()
+
+# Initialize async OpenAI client so LLM calls never block the event loop
+client = AsyncOpenAI(
+    base_url="https://api.galadriel.com/v1",
+    api_key=os.getenv("AI_API_KEY"),
+)
+
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3.1:70b")
+
+# Limits (override in .env)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "100000"))
+
+# Failures worth retrying on a later run (network, timeout, 429, 5xx)
+TRANSIENT_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError,
+                    asyncio.TimeoutError)
+
+class LLMError(Exception):
+    """An LLM request failed for a transient reason; the work should be retried later"""
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+def extract_json(text: str, opener: str = '{'):
+    """The outermost JSON object ('{') or array ('[') in a response, or None if it does not parse"""
+    closer = '}' if opener == '{' else ']'
+    start, end = text.find(opener), text.rfind(closer) + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end])
+    except json.JSONDecodeError:
+        return None
+
+def is_json_object(text: str) -> bool:
+    return isinstance(extract_json(text, '{'), dict)
+
+def is_json_array(text: str) -> bool:
+    return isinstance(extract_json(text, '['), list)
+
+class RateLimiter:
+    """
+    Sliding one-minute window over requests and tokens
+
+    `acquire` waits until sending one more request of the given size keeps
+    both the requests-per-minute and tokens-per-minute budgets.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._sent = deque()  # (timestamp, tokens)
+        self._tokens_in_window = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float):
+        while self._sent and now - self._sent[0][0] >= self.window:
+            _, tokens = self._sent.popleft()
+            self._tokens_in_window -= tokens
+
+    async def acquire(self, tokens: int):
+        # A single request larger than the budget is let through on an empty window
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute > 0 else tokens
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                requests_ok = self.requests_per_minute <= 0 or len(self._sent) < self.requests_per_minute
+                tokens_ok = self.tokens_per_minute <= 0 or self._tokens_in_window + tokens <= self.tokens_per_minute
+                if requests_ok and tokens_ok:
+                    self._sent.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+                # Sleep until the oldest request leaves the window
+                await asyncio.sleep(max(0.05, self.window - (now - self._sent[0][0])))
+
+_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+_rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+async def chat_completion(system_prompt: str, user_prompt: str, model: str = LLM_MODEL,
+                          use_cache: bool = True,
+                          validate: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Send one chat completion through the shared concurrency and rate limits
+
+    Responses are served from the on-disk LLM cache when the same model and
+    prompts were seen before. With `validate`, only responses the caller can
+    use (e.g. that parse as JSON) are cached, and cached responses failing
+    it are requested again, so a truncated answer is never replayed.
+
+    Args:
+        system_prompt: System message content
+        user_prompt: User message content
+        model: Model name
+        use_cache: Set False to neither read nor write the cache
+        validate: Returns True if a response text is usable
+
+    Returns:
+        Stripped response text
+
+    Raises:
+        LLMError: on network errors, timeouts, rate limiting and server errors
+    """
+    key = llm_cache.cache_key(model, system_prompt, user_prompt) if use_cache else None
+    if key:
+        cached = await llm_cache.get_async(key)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
+
+    messages: List[Dict] = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    try:
+        async with _semaphore:
+            await _rate_limiter.acquire(estimate_tokens(system_prompt + user_prompt))
+            completion = await client.chat.completions.create(
+                model=model,
+                messages=messages
+            )
+    except TRANSIENT_ERRORS as e:
+        raise LLMError(f"LLM request failed: {str(e) or type(e).__name__}") from e
+    response_text = completion.choices[0].message.content.strip()
+    if key and (validate is None or validate(response_text)):
+        await llm_cache.put_async(key, model, response_text)
+    elif key:
+        print("Not caching LLM response that failed validation")
+    return response_text
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache settings (override in .env)
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join("processed_results", "llm_cache"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# Bump to invalidate every entry at once (e.g. after changing response parsing)
+LLM_CACHE_NAMESPACE = os.getenv("LLM_CACHE_NAMESPACE", "v1")
+
+# Run size-based eviction after this many writes
+_EVICT_EVERY = 200
+
+# Set inside a `cache_bypass()` block to skip cache reads (writes still refresh entries)
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "writes": 0,
+    "expired": 0,
+    "evicted": 0,
+    "bypassed": 0
+}
+_writes_since_evict = 0
+# Background eviction started by put_async, if one is running
+_evict_task: Optional[asyncio.Task] = None
+
+def cache_key(model: str, system_prompt: str, user_prompt: str) -> str:
+    """Content address of a request: hash of namespace + model + both prompts"""
+    payload = json.dumps([LLM_CACHE_NAMESPACE, model, system_prompt, user_prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _entry_path(key: str) -> str:
+    return os.path.join(LLM_CACHE_DIR, key[:2], f"{key}.json")
+
+@contextmanager
+def cache_bypass(enabled: bool = True):
+    """Skip cached responses for LLM calls made inside this block"""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for a key, or None on miss/expiry/bypass"""
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _bypass.get():
+        _stats["bypassed"] += 1
+        return None
+    path = _entry_path(key)
+    try:
+        if LLM_CACHE_MAX_AGE_DAYS > 0 and time.time() - os.path.getmtime(path) > LLM_CACHE_MAX_AGE_DAYS * 86400:
+            os.remove(path)
+            _stats["expired"] += 1
+            _stats["misses"] += 1
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        _stats["hits"] += 1
+        return entry["response"]
+    except FileNotFoundError:
+        _stats["misses"] += 1
+        return None
+    except Exception as e:
+        print(f"Error reading LLM cache entry {key}: {str(e)}")
+        _stats["misses"] += 1
+        return None
+
+async def get_async(key: str) -> Optional[str]:
+    """`get` with the file I/O in a worker thread, for use on the event loop"""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return await asyncio.to_thread(get, key)
+
+def put(key: str, model: str, response: str):
+    """Store a response atomically under its content address"""
+    if _write(key, model, response):
+        evict()
+
+async def put_async(key: str, model: str, response: str):
+    """
+    `put` with the file I/O in a worker thread, for use on the event loop
+
+    Size-based eviction walks the whole cache directory, so when it is due
+    it runs as a background task instead of delaying this request.
+    """
+    global _evict_task
+    if not LLM_CACHE_ENABLED:
+        return
+    if await asyncio.to_thread(_write, key, model, response):
+        if _evict_task is None or _evict_task.done():
+            _evict_task = asyncio.create_task(asyncio.to_thread(_evict_quietly))
+
+def _evict_quietly():
+    try:
+        evict()
+    except Exception as e:
+        print(f"Error evicting LLM cache entries: {str(e)}")
+
+def _write(key: str, model: str, response: str) -> bool:
+    """Write one entry; True when size-based eviction is due"""
+    global _writes_since_evict
+    if not LLM_CACHE_ENABLED:
+        return False
+    path = _entry_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model": model,
+                "response": response,
+                "cached_at": time.time()
+            }, f)
+        os.replace(tmp_path, path)
+        _stats["writes"] += 1
+        _writes_since_evict += 1
+        return _writes_since_evict >= _EVICT_EVERY
+    except Exception as e:
+        print(f"Error writing LLM cache entry {key}: {str(e)}")
+        return False
+
+def evict() -> int:
+    """Drop expired entries, then the oldest ones until under size limits"""
+    global _writes_since_evict
+    _writes_since_evict = 0
+    if not os.path.exists(LLM_CACHE_DIR):
+        return 0
+    entries = []
+    now = time.time()
+    removed = 0
+    for root, _, files in os.walk(LLM_CACHE_DIR):
+        for name in files:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if LLM_CACHE_MAX_AGE_DAYS > 0 and now - st.st_mtime > LLM_CACHE_MAX_AGE_DAYS * 86400:
+                os.remove(path)
+                removed += 1
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+    entries.sort()  # Oldest first
+    total_bytes = sum(size for _, size, _ in entries)
+    while entries and (len(entries) > LLM_CACHE_MAX_ENTRIES or total_bytes > LLM_CACHE_MAX_BYTES):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        removed += 1
+
+    _stats["evicted"] += removed
+    if removed:
+        print(f"Evicted {removed} LLM cache entries")
+    return removed
+
+def clear() -> int:
+    """Remove every cached response"""
+    removed = 0
+    if os.path.exists(LLM_CACHE_DIR):
+        for root, _, files in os.walk(LLM_CACHE_DIR):
+            for name in files:
+                if name.endswith('.json'):
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+    print(f"Cleared {removed} LLM cache entries")
+    return removed
+
+def get_stats() -> Dict:
+    """Hit/miss counters for this process"""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        "enabled": LLM_CACHE_ENABLED,
+        "namespace": LLM_CACHE_NAMESPACE
+    }
@@ -0,0 +1,104 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+# Processing manifest lives next to the processed results
+MANIFEST_FILE = os.path.join("processed_results", "manifest.json")
+
+def load_manifest() -> Dict:
+    """
+    Load the processing manifest
+
+    Returns a dict of the form:
+        {"files": {doc_id: {"content_hash", "events", "processed_at", "size"?, "mtime_ns"?}}}
+
+    A None content_hash marks a document whose last reprocessing failed:
+    its previous events are kept and it is retried as modified.
+    """
+    try:
+        if os.path.exists(MANIFEST_FILE):
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+                manifest.setdefault("files", {})
+                return manifest
+    except Exception as e:
+        print(f"Error loading manifest: {str(e)}")
+    return {"files": {}}
+
+def save_manifest(manifest: Dict):
+    """Write the manifest atomically so a crash never leaves it half-written"""
+    os.makedirs(os.path.dirname(MANIFEST_FILE), exist_ok=True)
+    manifest["updated_at"] = datetime.now().isoformat()
+    tmp_path = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def update_manifest(updates: Dict[str, Dict], removed: Iterable[str] = ()) -> Dict:
+    """
+    Merge file entries into the manifest on disk and save it
+
+    Re-reads the manifest first, so entries recorded by another run since
+    this one loaded it are kept instead of being overwritten by a stale copy.
+
+    Args:
+        updates: doc_id to entry (as built by record_file)
+        removed: doc_ids whose entries are dropped (deleted or failed documents)
+
+    Returns:
+        The merged manifest
+    """
+    merged = load_manifest()
+    for name in removed:
+        merged["files"].pop(name, None)
+    merged["files"].update(updates)
+    save_manifest(merged)
+    return merged
+
+def diff_manifest(manifest: Dict, current: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Compare the manifest with the documents currently on disk
+
+    Args:
+        manifest: Loaded manifest
+        current: Mapping of doc_id to content hash for documents in the HTML store
+
+    Returns:
+        Dict with "new", "modified", "unchanged" and "deleted" file names
+    """
+    recorded = manifest.get("files", {})
+    changes = {"new": [], "modified": [], "unchanged": [], "deleted": []}
+    for name, digest in current.items():
+        entry = recorded.get(name)
+        if entry is None:
+            changes["new"].append(name)
+        elif entry.get("content_hash") != digest:
+            changes["modified"].append(name)
+        else:
+            changes["unchanged"].append(name)
+    changes["deleted"] = [name for name in recorded if name not in current]
+    return changes
+
+def record_file(manifest: Dict, name: str, digest: str, events: List[Dict], stat: Optional[Dict] = None):
+    """
+    Record the events produced by one document
+
+    `stat` (size and mtime_ns of the document's file, taken no later than
+    the hash) lets the next listing skip rehashing an unchanged file.
+    """
+    entry = {
+        "content_hash": digest,
+        "events": events,
+        "processed_at": datetime.now().isoformat()
+    }
+    if stat:
+        entry.update(size=stat["size"], mtime_ns=stat["mtime_ns"])
+    manifest.setdefault("files", {})[name] = entry
+
+def all_events(manifest: Dict) -> List[Dict]:
+    """Every event from every file still present in the manifest"""
+    events = []
+    for entry in manifest.get("files", {}).values():
+        events.extend(entry.get("events", []))
+    return events
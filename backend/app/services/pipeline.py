@@ -0,0 +1,100 @@
+import asyncio
+import os
+import time
+from typing import Dict, List
+from dotenv import load_dotenv
+from app.services import event_store
+from app.services import manifest
+from app.services import pipeline_stats
+from app.services.crawler import crawl_hackathons
+from app.services.html_store import get_html_store
+from app.services.processor import FILE_CONCURRENCY, process_all_files, process_document
+
+load_dotenv()
+
+# Workers extracting events from freshly crawled pages
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", str(FILE_CONCURRENCY)))
+# Pages waiting for a worker before the crawler pauses
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", str(2 * PIPELINE_WORKERS)))
+
+async def run_pipeline(workers: int = PIPELINE_WORKERS, queue_size: int = PIPELINE_QUEUE_SIZE) -> Dict:
+    """
+    Crawl and process in one streaming pass
+
+    The crawler puts each stored page on a bounded queue and worker tasks
+    extract its events right away, publishing them to the event store and
+    recording them for the processing manifest. When the workers (i.e. the
+    LLM) fall behind, the queue fills and the crawler stops starting new
+    fetches. Once the crawl is done and the queue drained, the recorded
+    files are merged into the manifest as it is on disk, and
+    process_all_files picks up anything left over and rebuilds the
+    deduplicated results from the manifest.
+
+    Returns:
+        Dictionary with crawl, streaming and processing statistics
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    # Entries for the documents processed here, merged into the manifest at the end
+    updates = {"files": {}}
+    store = get_html_store()
+    started = time.monotonic()
+    streamed = {"pages_processed": 0, "pages_failed": 0, "events_found": 0,
+                "first_event_seconds": None}
+
+    async def worker():
+        while True:
+            page = await queue.get()
+            try:
+                if page is None:
+                    return
+                doc_id = page['doc_id']
+                # Stat before hashing, so a later change is never hidden behind an old hash
+                stat = store.file_stat(doc_id)
+                digest = store.digest(doc_id)
+                events = await process_document(doc_id)
+                event_store.upsert_events(events)
+                if digest:
+                    manifest.record_file(updates, doc_id, digest, events, stat)
+                streamed["pages_processed"] += 1
+                streamed["events_found"] += len(events)
+                if events and streamed["first_event_seconds"] is None:
+                    streamed["first_event_seconds"] = round(time.monotonic() - started, 2)
+                    print(f"First events after {streamed['first_event_seconds']}s")
+                pipeline_stats.update_progress("pipeline", **streamed)
+            except Exception as e:
+                # Left out of the manifest, so process_all_files retries it
+                print(f"Error processing streamed page: {str(e)}")
+                streamed["pages_failed"] += 1
+            finally:
+                queue.task_done()
+
+    pipeline_stats.start_run("pipeline", stage="streaming", **streamed)
+    result: Dict = {"status": "cancelled"}
+    tasks: List[asyncio.Task] = []
+    try:
+        tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+        crawl_result = await crawl_hackathons(page_queue=queue)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+        manifest.update_manifest(updates["files"])
+
+        pipeline_stats.update_progress("pipeline", stage="merging")
+        process_result = await process_all_files(merge=True)
+        result = {
+            "status": "error" if "error" in (crawl_result["status"], process_result["status"]) else "success",
+            "crawl": crawl_result,
+            "streaming": dict(streamed),
+            "process": process_result,
+            "duration_seconds": round(time.monotonic() - started, 2)
+        }
+        if result["status"] == "error":
+            result["message"] = crawl_result.get("message") or process_result.get("message")
+        return result
+    finally:
+        for task in tasks:
+            task.cancel()
+        if result["status"] == "cancelled":
+            # Keep what the workers finished so it is not redone
+            manifest.update_manifest(updates["files"])
+        pipeline_stats.finish_run("pipeline", status=result["status"], **streamed)
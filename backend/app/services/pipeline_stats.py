@@ -0,0 +1,152 @@
+import copy
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Counters persist next to the processed results
+STATS_FILE = os.path.join("processed_results", "pipeline_stats.json")
+
+EVENT_TYPES = ['hackathon', 'conference', 'meetup']
+
+_stats: Optional[Dict] = None
+_in_flight: Dict[str, Dict] = {}
+_version = 0
+
+def _event_counts(events: List[Dict]) -> Dict:
+    by_type = {event_type: 0 for event_type in EVENT_TYPES}
+    by_mode: Dict[str, int] = {}
+    for event in events:
+        event_type = str(event.get('event_type') or '').lower()
+        if event_type in by_type:
+            by_type[event_type] += 1
+        mode = str(event.get('mode') or 'unknown').lower()
+        by_mode[mode] = by_mode.get(mode, 0) + 1
+    return {"events_total": len(events), "events_by_type": by_type, "events_by_mode": by_mode}
+
+def _initial_stats() -> Dict:
+    """Seed counters from the stores once, when no stats file exists yet"""
+    from app.services.html_store import get_html_store
+    from app.services import manifest
+    from app.services.event_store import RESPONSES_FILE
+    files_crawled = get_html_store().count()
+    processed = len(manifest.load_manifest().get("files", {}))
+    events = []
+    if os.path.exists(RESPONSES_FILE):
+        try:
+            with open(RESPONSES_FILE, 'r', encoding='utf-8') as f:
+                events = json.load(f)
+        except Exception as e:
+            print(f"Error reading events for pipeline stats: {str(e)}")
+    return {
+        "files_crawled": files_crawled,
+        "files_pending": max(0, files_crawled - processed),
+        **_event_counts(events),
+        "runs": {}
+    }
+
+def _load() -> Dict:
+    global _stats
+    if _stats is None:
+        try:
+            if os.path.exists(STATS_FILE):
+                with open(STATS_FILE, 'r', encoding='utf-8') as f:
+                    _stats = json.load(f)
+        except Exception as e:
+            print(f"Error loading pipeline stats: {str(e)}")
+        if _stats is None:
+            _stats = _initial_stats()
+            _save()
+    return _stats
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+        tmp_path = f"{STATS_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_stats, f, indent=2)
+        os.replace(tmp_path, STATS_FILE)
+    except Exception as e:
+        print(f"Error saving pipeline stats: {str(e)}")
+
+def _bump():
+    global _version
+    _version += 1
+
+def record_crawled(count: int = 1):
+    """A new document was stored and now awaits processing"""
+    stats = _load()
+    stats["files_crawled"] += count
+    stats["files_pending"] += count
+    _bump()
+
+def set_crawled(count: int):
+    """Resync the document count with the store (re-crawls replace documents in pack storage)"""
+    stats = _load()
+    stats["files_pending"] = max(0, stats["files_pending"] + count - stats["files_crawled"])
+    stats["files_crawled"] = count
+    _save()
+    _bump()
+
+def set_pending(count: int):
+    """Documents still waiting for (or failed) processing after a run"""
+    _load()["files_pending"] = max(0, count)
+    _save()
+    _bump()
+
+def set_event_counts(events: List[Dict]):
+    """Recount events by type and mode, once per write of the event set"""
+    _load().update(_event_counts(events))
+    _save()
+    _bump()
+
+def start_run(kind: str, **progress):
+    """Mark a crawl/process run as in flight"""
+    _in_flight[kind] = {
+        "started_at": datetime.now().isoformat(),
+        "_started": time.monotonic(),
+        **progress
+    }
+    _bump()
+
+def update_progress(kind: str, **progress):
+    """Update counters of an in-flight run (e.g. files_done=3)"""
+    if kind in _in_flight:
+        _in_flight[kind].update(progress)
+        _bump()
+
+def increment_progress(kind: str, field: str, amount: int = 1):
+    if kind in _in_flight:
+        _in_flight[kind][field] = _in_flight[kind].get(field, 0) + amount
+        _bump()
+
+def finish_run(kind: str, status: str = "success", **summary):
+    """Record the last run's timing and outcome and clear its progress"""
+    run = _in_flight.pop(kind, None)
+    stats = _load()
+    finished_at = datetime.now()
+    entry = {
+        "status": status,
+        "finished_at": finished_at.isoformat(),
+        **summary
+    }
+    if run:
+        entry["started_at"] = run["started_at"]
+        entry["duration_seconds"] = round(time.monotonic() - run["_started"], 2)
+    stats.setdefault("runs", {})[kind] = entry
+    _save()
+    _bump()
+
+def get_version() -> int:
+    """Counter bumped on every change, for response caching"""
+    return _version
+
+def get_stats() -> Dict:
+    """Current counters plus in-flight progress; no filesystem access after the first call"""
+    stats = copy.deepcopy(_load())
+    stats["in_flight"] = {
+        kind: {key: value for key, value in run.items() if not key.startswith('_')}
+        for kind, run in _in_flight.items()
+    }
+    return stats
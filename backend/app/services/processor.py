@@ -1,52 +1,43 @@
 from fastapi import FastAPI, HTTPException
+import asyncio
 import json
 import os
-from openai import OpenAI
 from dotenv import load_dotenv
 import time
-from bs4 import BeautifulSoup
-import re
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+from app.services.llm import LLMError, chat_completion, estimate_tokens, extract_json, is_json_array
+from app.services import chunker
+from app.services import relevance
+from app.services import llm_cache
+from app.services import manifest
+from app.services import event_store
+from app.services import pipeline_stats
+from app.services import dedup
+from app.services import dates
+from app.services.html_store import FileHtmlStore, get_html_store
+from app.services.document import html_blocks
+from app.services.workers import run_cpu
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI Client
-client = OpenAI(
-    base_url="https://api.galadriel.com/v1",
-    api_key=os.getenv("AI_API_KEY"),
-)
-
 # Directories setup
 HTML_DIR = "crawled_data/html"
 OUTPUT_DIR = "processed_results"
-CHUNK_SIZE = 4000
+# Upper bound on the chunk text sent in one extraction prompt
+EXTRACT_MAX_TOKENS = int(os.getenv("EXTRACT_MAX_TOKENS", str(3 * chunker.CHUNK_MAX_TOKENS)))
+# Chunks analyzed together in one request (by size and by count)
+ANALYZE_BATCH_TOKENS = int(os.getenv("ANALYZE_BATCH_TOKENS", str(3 * chunker.CHUNK_MAX_TOKENS)))
+ANALYZE_BATCH_MAX_CHUNKS = int(os.getenv("ANALYZE_BATCH_MAX_CHUNKS", "8"))
+# Number of HTML files processed at the same time (LLM calls are limited separately)
+FILE_CONCURRENCY = int(os.getenv("PROCESS_FILE_CONCURRENCY", "4"))
 
 os.makedirs(HTML_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def clean_html(html_content: str) -> str:
-    """Clean and extract relevant content from HTML"""
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe']):
-            element.decompose()
-        
-        # Extract text from remaining elements
-        text = soup.get_text(separator='\n', strip=True)
-        
-        # Basic text cleaning
-        text = re.sub(r'\n+', '\n', text)  # Remove multiple newlines
-        text = re.sub(r'\s+', ' ', text)   # Normalize whitespace
-        
-        return text
-        
-    except Exception as e:
-        print(f"Error cleaning HTML: {str(e)}")
-        return html_content
+# Analysis requests since startup, reported with processing results
+analysis_stats = {"chunks": 0, "batch_requests": 0, "single_requests": 0, "fallbacks": 0}
 
 async def analyze_chunk(chunk: str) -> Dict:
     """Initial analysis of chunk content"""
@@ -65,38 +56,166 @@ async def analyze_chunk(chunk: str) -> Dict:
         {chunk}
         """
 
-        completion = client.chat.completions.create(
-            model="llama3.1:70b",
-            messages=[
-                {"role": "system", "content": "You are a JSON generator that analyzes text for tech events. Always return valid JSON."},
-                {"role": "user", "content": prompt}
-            ]
+        response_text = await chat_completion(
+            "You are a JSON generator that analyzes text for tech events. Always return valid JSON.",
+            prompt,
+            validate=lambda text: _parse_analysis(text) is not None
         )
-
-        # Get the response content
-        response_text = completion.choices[0].message.content.strip()
-        
-        # Try to find JSON in the response
-        json_start = response_text.find('{')
-        json_end = response_text.rfind('}') + 1
         
-        if json_start >= 0 and json_end > json_start:
-            json_str = response_text[json_start:json_end]
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                print(f"Invalid JSON in response: {json_str}")
-                return {"has_event": False, "relevance_score": 0}
-        else:
-            print("No JSON found in response")
+        # Normalized like batch items, so callers can rely on the field types
+        analysis = _parse_analysis(response_text)
+        if analysis is None:
+            print(f"Unusable analysis in response: {response_text[:200]}")
             return {"has_event": False, "relevance_score": 0}
+        return analysis
 
+    except LLMError:
+        raise
     except Exception as e:
         print(f"Error analyzing chunk: {str(e)}")
         return {"has_event": False, "relevance_score": 0}
 
-async def extract_event_details(relevant_chunks: List[str], url: str) -> List[Dict]:
-    """Extract detailed event information from relevant chunks"""
+def _parse_json_items(text: str) -> List[Dict]:
+    """
+    JSON objects in an LLM response
+
+    Reads the whole array when it parses; otherwise recovers each object
+    that does, so one malformed item does not lose the rest.
+    """
+    json_start = text.find('[')
+    json_end = text.rfind(']') + 1
+    if json_start >= 0 and json_end > json_start:
+        try:
+            items = json.loads(text[json_start:json_end])
+            if isinstance(items, list):
+                return [item for item in items if isinstance(item, dict)]
+        except json.JSONDecodeError:
+            pass
+    decoder = json.JSONDecoder()
+    items, position = [], text.find('{')
+    while position >= 0:
+        try:
+            item, end = decoder.raw_decode(text, position)
+            if isinstance(item, dict):
+                items.append(item)
+            position = text.find('{', end)
+        except json.JSONDecodeError:
+            position = text.find('{', position + 1)
+    return items
+
+def _valid_analysis(item: Dict) -> Optional[Dict]:
+    """Normalized analysis from one batch item, or None if it is unusable"""
+    has_event = item.get('has_event')
+    if isinstance(has_event, str):
+        has_event = {'true': True, 'false': False}.get(has_event.strip().lower())
+    try:
+        score = float(item.get('relevance_score'))
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(has_event, bool):
+        return None
+    return {
+        "has_event": has_event,
+        "event_type": item.get('event_type', 'unknown'),
+        "relevance_score": score,
+        "key_points": item.get('key_points') if isinstance(item.get('key_points'), list) else []
+    }
+
+def _parse_analysis(text: str) -> Optional[Dict]:
+    """Normalized analysis from a single-chunk response, or None if it is unusable"""
+    item = extract_json(text, '{')
+    return _valid_analysis(item) if isinstance(item, dict) else None
+
+async def analyze_batch(batch: List[Tuple[str, str]]) -> Dict[str, Dict]:
+    """
+    Analyze several chunks in one request
+
+    Args:
+        batch: (chunk_id, text) pairs
+
+    Returns:
+        Analyses by chunk_id for the items the model answered validly
+    """
+    try:
+        sections = "\n\n".join(f"[chunk {chunk_id}]\n{text}" for chunk_id, text in batch)
+        prompt = f"""
+        Analyze each of these text chunks and tell me if it contains any tech event information.
+        Return ONLY a JSON array with one object per chunk, using these exact fields:
+        [
+            {{
+                "chunk_id": "id from the chunk header",
+                "has_event": true/false,
+                "event_type": "hackathon/conference/meetup/unknown",
+                "relevance_score": 0-10,
+                "key_points": ["point1", "point2"]
+            }}
+        ]
+
+        Chunks:
+        {sections}
+        """
+
+        response_text = await chat_completion(
+            "You are a JSON generator that analyzes text for tech events. Always return a valid JSON array.",
+            prompt,
+            validate=lambda text: bool(_parse_json_items(text))
+        )
+        
+        ids = {chunk_id for chunk_id, _ in batch}
+        analyses = {}
+        for item in _parse_json_items(response_text):
+            chunk_id = str(item.get('chunk_id', '')).strip()
+            analysis = _valid_analysis(item)
+            if chunk_id in ids and analysis is not None:
+                analyses[chunk_id] = analysis
+        return analyses
+
+    except LLMError:
+        raise
+    except Exception as e:
+        print(f"Error analyzing chunk batch: {str(e)}")
+        return {}
+
+async def analyze_chunks(chunks: List[str]) -> List[Dict]:
+    """
+    Analyze chunks in as few requests as the batch budget allows
+
+    Chunks are packed into batches of up to ANALYZE_BATCH_TOKENS and
+    ANALYZE_BATCH_MAX_CHUNKS. Chunks a batch response misses or garbles are
+    retried on their own with analyze_chunk.
+    """
+    groups = group_chunks(chunks, ANALYZE_BATCH_TOKENS, ANALYZE_BATCH_MAX_CHUNKS)
+    batches, offset = [], 0
+    for group in groups:
+        batches.append([(f"c{offset + i + 1}", chunk) for i, chunk in enumerate(group)])
+        offset += len(group)
+    
+    async def run(batch: List[Tuple[str, str]]) -> Dict[str, Dict]:
+        if len(batch) == 1:
+            analysis_stats["single_requests"] += 1
+            return {batch[0][0]: await analyze_chunk(batch[0][1])}
+        analysis_stats["batch_requests"] += 1
+        analyses = await analyze_batch(batch)
+        missing = [(chunk_id, text) for chunk_id, text in batch if chunk_id not in analyses]
+        if missing:
+            print(f"Batch answered {len(batch) - len(missing)}/{len(batch)} chunks, retrying the rest singly")
+            analysis_stats["fallbacks"] += len(missing)
+            retried = await asyncio.gather(*[analyze_chunk(text) for _, text in missing])
+            analyses.update({chunk_id: analysis for (chunk_id, _), analysis in zip(missing, retried)})
+        return analyses
+    
+    results = await asyncio.gather(*[run(batch) for batch in batches])
+    analysis_stats["chunks"] += len(chunks)
+    merged = {chunk_id: analysis for result in results for chunk_id, analysis in result.items()}
+    return [merged[f"c{i + 1}"] for i in range(len(chunks))]
+
+async def extract_event_details(relevant_chunks: List[str], url: str, crawled_at: str = None) -> List[Dict]:
+    """
+    Extract detailed event information from relevant chunks
+
+    Each event's date gets normalized start_iso/end_iso/precision fields,
+    with years of partial dates inferred relative to crawled_at.
+    """
     try:
         combined_text = "\n\n===CHUNK SEPARATOR===\n\n".join(relevant_chunks)
         
@@ -131,16 +250,11 @@ async def extract_event_details(relevant_chunks: List[str], url: str) -> List[Di
         {combined_text}
         """
 
-        completion = client.chat.completions.create(
-            model="llama3.1:70b",
-            messages=[
-                {"role": "system", "content": "You are a JSON generator that extracts event information. Always return a valid JSON array."},
-                {"role": "user", "content": prompt}
-            ]
+        response_text = await chat_completion(
+            "You are a JSON generator that extracts event information. Always return a valid JSON array.",
+            prompt,
+            validate=is_json_array
         )
-
-        # Get the response content
-        response_text = completion.choices[0].message.content.strip()
         
         # Try to find JSON array in the response
         json_start = response_text.find('[')
@@ -154,9 +268,11 @@ async def extract_event_details(relevant_chunks: List[str], url: str) -> List[Di
                     events = [events]
                 
                 # Add metadata
+                processed_at = datetime.now().isoformat()
                 for event in events:
                     event['source_url'] = url
-                    event['processed_at'] = datetime.now().isoformat()
+                    event['processed_at'] = processed_at
+                    dates.normalize_event(event, crawled_at or processed_at)
                 
                 return events
             except json.JSONDecodeError as e:
@@ -166,56 +282,117 @@ async def extract_event_details(relevant_chunks: List[str], url: str) -> List[Di
             print("No JSON array found in response")
             return []
 
+    except LLMError:
+        raise
     except Exception as e:
         print(f"Error extracting event details: {str(e)}")
         return []
 
+async def document_blocks(document: Dict) -> List[Dict]:
+    """Text blocks prepared at crawl time, or freshly extracted for older documents"""
+    metadata = document.get('metadata') or {}
+    if 'blocks' in metadata:
+        return metadata['blocks']
+    if 'text' in metadata:
+        return chunker.blocks_from_text(metadata['text'])
+    # Parsing runs in the CPU pool
+    return await run_cpu(html_blocks, document['html'])
+
+def document_crawled_at(document: Dict) -> Optional[str]:
+    """When a stored page was crawled, falling back to when it was saved"""
+    metadata = document.get('metadata') or {}
+    return metadata.get('crawled_at') or document.get('saved_at')
+
 async def process_html_file(file_path: str) -> List[Dict]:
     """Process a single HTML file with smart chunking"""
+    print(f"\nProcessing file: {file_path}")
+    document = FileHtmlStore(os.path.dirname(file_path)).read(os.path.basename(file_path))
+    if document is None:
+        print(f"File not found: {file_path}")
+        return []
+    return await process_blocks(await document_blocks(document), document['url'],
+                                document_crawled_at(document))
+
+async def process_document(doc_id: str) -> List[Dict]:
+    """Process a single document from the HTML store with smart chunking"""
+    print(f"\nProcessing document: {doc_id}")
+    document = get_html_store().read(doc_id)
+    if document is None:
+        print(f"Document not found: {doc_id}")
+        return []
+    return await process_blocks(await document_blocks(document), document['url'],
+                                document_crawled_at(document))
+
+def group_chunks(chunks: List[str], max_tokens: int = EXTRACT_MAX_TOKENS,
+                 max_chunks: Optional[int] = None) -> List[List[str]]:
+    """Group consecutive chunks so each prompt stays within budget"""
+    groups, current, current_tokens = [], [], 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk)
+        if current and (current_tokens + tokens > max_tokens or (max_chunks and len(current) >= max_chunks)):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def chunk_and_score(blocks: List[Dict]) -> Tuple[List[str], List[str]]:
+    """Chunks of a page and the relevance pre-filter's decision for each (CPU-bound)"""
+    chunks = chunker.chunk_blocks(blocks)
+    return chunks, [relevance.classify(chunk)[0] for chunk in chunks]
+
+async def process_blocks(blocks: List[Dict], url: str, crawled_at: str = None) -> List[Dict]:
+    """
+    Chunk, analyze and extract events from a page's text blocks
+
+    Raises:
+        LLMError: if an LLM request failed, so the page is not mistaken for
+            one without events
+    """
     try:
-        print(f"\nProcessing file: {file_path}")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract URL from content
-        url = content.split('\n')[0].replace('Source URL: ', '').strip()
         print(f"URL: {url}")
+        # Chunk and score chunks locally in the CPU pool: obvious boilerplate
+        # is dropped and obvious event text skips the analysis call
+        chunks, decisions = await run_cpu(chunk_and_score, blocks)
+        print(f"Chunks: {chunker.record(chunks)}")
+        if not chunks:
+            return []
         
-        # Clean content
-        cleaned_text = clean_html(content)
-        print(f"Content length: {len(cleaned_text)} characters")
+        relevance.record(decisions)
+        uncertain = [i for i, decision in enumerate(decisions) if decision == 'llm']
+        print(f"Pre-filter: {decisions.count('keep')} kept, {len(uncertain)} uncertain, "
+              f"{decisions.count('drop')} dropped")
         
-        # Only chunk if content is large
-        if len(cleaned_text) > CHUNK_SIZE:
-            print("Content is large, chunking...")
-            # Split into paragraphs
-            chunks = [chunk.strip() for chunk in cleaned_text.split('\n\n') if chunk.strip()]
-            print(f"Split into {len(chunks)} chunks")
-            
-            # Analyze each chunk
-            relevant_chunks = []
-            for i, chunk in enumerate(chunks, 1):
-                print(f"Analyzing chunk {i}/{len(chunks)}...")
-                analysis = await analyze_chunk(chunk)
-                print(f"Chunk {i} analysis: {analysis}")
+        # Only analyze uncertain chunks when the page does not fit in one
+        if len(chunks) > 1 and uncertain:
+            # Analyze in batched requests, run concurrently (bounded by the LLM limiter)
+            print(f"Analyzing {len(uncertain)} chunks...")
+            analyses = await analyze_chunks([chunks[i] for i in uncertain])
+            for i, analysis in zip(uncertain, analyses):
+                print(f"Chunk {i + 1} analysis: {analysis}")
                 if analysis.get('has_event', False) and analysis.get('relevance_score', 0) > 5:
-                    relevant_chunks.append(chunk)
-            
-            print(f"Found {len(relevant_chunks)} relevant chunks")
-            if relevant_chunks:
-                events = await extract_event_details(relevant_chunks, url)
-                print(f"Extracted {len(events)} events")
-                return events
-        else:
+                    decisions[i] = 'keep'
+        elif uncertain:
             print("Processing content directly...")
-            events = await extract_event_details([cleaned_text], url)
-            print(f"Extracted {len(events)} events")
-            return events
-            
-        return []
+            decisions[0] = 'keep'
+        
+        relevant_chunks = [chunk for chunk, decision in zip(chunks, decisions) if decision == 'keep']
+        print(f"Found {len(relevant_chunks)} relevant chunks")
         
+        # Extract in prompts of bounded size rather than one call with every relevant chunk
+        results = await asyncio.gather(*[
+            extract_event_details(group, url, crawled_at) for group in group_chunks(relevant_chunks)
+        ])
+        events = [event for group_events in results for event in group_events]
+        print(f"Extracted {len(events)} events")
+        return events
+        
+    except LLMError:
+        raise  # Keeps the file pending so the next run retries it
     except Exception as e:
-        print(f"Error processing file {file_path}: {str(e)}")
+        print(f"Error processing {url}: {str(e)}")
         return []
 
 def deduplicate_events(events: List[Dict]) -> List[Dict]:
@@ -227,7 +404,7 @@ def deduplicate_events(events: List[Dict]) -> List[Dict]:
         # Create a unique key using multiple fields
         key_parts = [
             event['title'].lower() if event.get('title') else '',
-            event.get('date', {}).get('start', ''),
+            event.get('date', {}).get('start_iso') or event.get('date', {}).get('start', ''),
             event.get('organizer', '').lower(),
             event.get('event_type', '').lower()
         ]
@@ -239,68 +416,35 @@ def deduplicate_events(events: List[Dict]) -> List[Dict]:
     
     return unique_events
 
-async def smart_deduplicate_with_llm(events: List[Dict]) -> List[Dict]:
-    """Use LLM to identify and merge duplicate events intelligently"""
+async def process_all_files(full: bool = False, merge: bool = False) -> Dict:
+    """
+    Process new or changed HTML documents with enhanced error handling and smart deduplication
+    
+    A processing manifest records each file's content hash and the events it
+    produced, so unchanged files are skipped, events from deleted files are
+    dropped, and fresh results are merged with the existing event set.
+    Progress and the run's outcome are reported to the pipeline counters.
+    
+    Args:
+        full: Reprocess every file regardless of the manifest
+        merge: Rebuild the results even if no document changed (e.g. after
+            the streaming pipeline recorded new documents in the manifest)
+    """
+    pipeline_stats.start_run("process", stage="scanning", files_total=0, files_done=0)
+    result = {"status": "cancelled"}
     try:
-        # Convert events to string representation
-        events_str = json.dumps(events, indent=2)
-        
-        prompt = f"""
-        Analyze this list of tech events and:
-        1. Identify duplicate events (same event with slightly different details)
-        2. Merge duplicate events keeping the most complete information
-        3. Return only unique events
-        4. Ensure all dates and details are consistent
-        
-        For events to be considered duplicates, they should have:
-        - Similar titles
-        - Same or overlapping dates
-        - Same organizer or similar tech stack
-        
-        Return ONLY a JSON array of unique events, merging information from duplicates.
-        Keep the most detailed version when merging.
-
-        Events to analyze:
-        {events_str}
-        """
-
-        completion = client.chat.completions.create(
-            model="llama3.1:70b",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are an expert at identifying and merging duplicate event information. Always return valid JSON array."
-                },
-                {"role": "user", "content": prompt}
-            ]
+        result = await _process_documents(full, merge)
+        return result
+    finally:
+        pipeline_stats.finish_run(
+            "process",
+            status=result["status"],
+            processed_files=result.get("processed_files", 0),
+            events_found=result.get("events_found")
         )
 
-        # Get the response content
-        response_text = completion.choices[0].message.content.strip()
-        
-        # Try to find JSON array in the response
-        json_start = response_text.find('[')
-        json_end = response_text.rfind(']') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            json_str = response_text[json_start:json_end]
-            try:
-                deduped_events = json.loads(json_str)
-                print(f"Reduced from {len(events)} to {len(deduped_events)} unique events")
-                return deduped_events
-            except json.JSONDecodeError as e:
-                print(f"Error parsing LLM deduplication response: {str(e)}")
-                return events
-        else:
-            print("No valid JSON array found in deduplication response")
-            return events
-
-    except Exception as e:
-        print(f"Error in smart deduplication: {str(e)}")
-        return events
-
-async def process_all_files() -> Dict:
-    """Process all HTML files with enhanced error handling and smart deduplication"""
+async def _process_documents(full: bool, merge: bool) -> Dict:
+    """Body of process_all_files"""
     try:
         all_events = []
         processed_files = 0
@@ -311,43 +455,112 @@ async def process_all_files() -> Dict:
             "events_extracted": 0
         }
         
-        html_files = [f for f in os.listdir(HTML_DIR) if f.endswith('.html')]
+        # List documents from the configured HTML store, reusing the
+        # manifest's hashes for files whose size and mtime are unchanged
+        previous_manifest = manifest.load_manifest()
+        documents = get_html_store().list_documents(known=previous_manifest["files"])
+        html_files = [doc['doc_id'] for doc in documents]
         
-        for file_name in html_files:
-            try:
+        # Work out what changed since the last run
+        current_hashes = {doc['doc_id']: doc['content_hash'] for doc in documents}
+        file_stats = {doc['doc_id']: doc for doc in documents if 'mtime_ns' in doc}
+        
+        file_manifest = {"files": {}} if full else previous_manifest
+        changes = manifest.diff_manifest(file_manifest, current_hashes)
+        to_process = changes["new"] + changes["modified"]
+        print(f"Manifest: {len(changes['new'])} new, {len(changes['modified'])} modified, "
+              f"{len(changes['unchanged'])} unchanged, {len(changes['deleted'])} deleted")
+        
+        output_file = os.path.join(OUTPUT_DIR, "responses.json")
+        pipeline_stats.update_progress("process", stage="extracting", files_total=len(to_process))
+        if not to_process and not changes["deleted"] and not merge and os.path.exists(output_file):
+            print("No new or changed files, results are up to date")
+            pipeline_stats.set_pending(0)
+            return {
+                "status": "success",
+                "message": "Results are up to date",
+                "total_files": len(html_files),
+                "processed_files": 0,
+                "skipped_files": len(changes["unchanged"]),
+                "deleted_files": 0
+            }
+        
+        # Drop events from files that no longer exist
+        removed = [name for name in previous_manifest["files"] if name not in current_hashes]
+        
+        # Process files in parallel, a few at a time
+        file_semaphore = asyncio.Semaphore(FILE_CONCURRENCY)
+        
+        async def process_one(file_name: str) -> List[Dict]:
+            async with file_semaphore:
                 print(f"Processing {file_name}...")
-                file_path = os.path.join(HTML_DIR, file_name)
-                events = await process_html_file(file_path)
-                
-                if events:
-                    all_events.extend(events)
-                    processed_files += 1
-                    print(f"Found {len(events)} events in {file_name}")
-                else:
-                    failed_files += 1
-                    print(f"No events found in {file_name}")
-                    
-            except Exception as e:
-                print(f"Error processing {file_name}: {str(e)}")
+                try:
+                    events = await process_document(file_name)
+                    # Publish right away; the final merge settles duplicates
+                    event_store.upsert_events(events)
+                    return events
+                finally:
+                    pipeline_stats.increment_progress("process", "files_done")
+        
+        results = await asyncio.gather(*[process_one(f) for f in to_process], return_exceptions=True)
+        
+        updates = {"files": {}}
+        for file_name, events in zip(to_process, results):
+            if isinstance(events, Exception):
+                print(f"Error processing {file_name}: {str(events)}")
+                failed_files += 1
+                previous = previous_manifest["files"].get(file_name)
+                if previous is not None:
+                    # Keep its last good events published, but clear the hash
+                    # so the next run retries it
+                    updates["files"][file_name] = {**previous, "content_hash": None}
+                continue
+            manifest.record_file(updates, file_name, current_hashes[file_name], events,
+                                 file_stats.get(file_name))
+            if events:
+                processed_files += 1
+                print(f"Found {len(events)} events in {file_name}")
+            else:
                 failed_files += 1
+                print(f"No events found in {file_name}")
+        
+        # Merge into the manifest as it is now on disk, not the copy loaded at the start
+        file_manifest = manifest.update_manifest(updates["files"], removed)
+        # Files that raised stay pending for the next run
+        pending = manifest.diff_manifest(file_manifest, current_hashes)
+        pipeline_stats.set_pending(len(pending["new"]) + len(pending["modified"]))
+        
+        # Merge fresh results with events from unchanged files
+        all_events = manifest.all_events(file_manifest)
+        # Events extracted before dates were normalized get their ISO dates now
+        for event in all_events:
+            if not isinstance(event.get('date'), dict) or 'start_iso' not in event['date']:
+                dates.normalize_event(event, event.get('processed_at'))
         
         # First do basic deduplication
         unique_events = deduplicate_events(all_events)
         
-        # Then do smart LLM-based deduplication
+        pipeline_stats.update_progress("process", stage="deduplicating")
+        # Then merge near-duplicates locally, asking the LLM only about ambiguous clusters
         print("\nPerforming smart deduplication...")
-        final_events = await smart_deduplicate_with_llm(unique_events)
+        final_events, dedup_stats = await dedup.deduplicate(unique_events)
         
+        pipeline_stats.update_progress("process", stage="saving")
         # Save results
-        output_file = os.path.join(OUTPUT_DIR, "responses.json")
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(final_events, f, indent=2)
         
+        # Keep the indexed event store and counters in sync for /results and /status
+        event_store.replace_events(final_events)
+        pipeline_stats.set_event_counts(final_events)
+        
         return {
             "status": "success",
             "total_files": len(html_files),
             "processed_files": processed_files,
             "failed_files": failed_files,
+            "skipped_files": len(changes["unchanged"]),
+            "deleted_files": len(changes["deleted"]),
             "events_found": len(final_events),
             "events_by_type": {
                 event_type: len([e for e in final_events if e.get('event_type', '').lower() == event_type])
@@ -356,8 +569,16 @@ async def process_all_files() -> Dict:
             "deduplication_stats": {
                 "initial_events": len(all_events),
                 "after_basic_dedup": len(unique_events),
-                "final_unique_events": len(final_events)
-            }
+                "final_unique_events": len(final_events),
+                "candidate_pairs": dedup_stats["candidate_pairs"],
+                "ambiguous_clusters": dedup_stats["ambiguous_clusters"],
+                "llm_batches": dedup_stats["llm_batches"],
+                "llm_merges": dedup_stats["llm_merges"]
+            },
+            "chunking": chunker.get_stats(),
+            "relevance_filter": relevance.get_stats(),
+            "analysis": dict(analysis_stats),
+            "llm_cache": llm_cache.get_stats()
         }
         
     except Exception as e:
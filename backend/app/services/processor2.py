@@ -1,19 +1,13 @@
 import os
 import json
 from typing import List, Dict
-from openai import OpenAI
 from datetime import datetime
 from dotenv import load_dotenv
 from fastapi import APIRouter, HTTPException
+from app.services.llm import chat_completion, is_json_object
 
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(
-    base_url="https://api.galadriel.com/v1",
-    api_key=os.getenv("AI_API_KEY"),
-)
-
 # Define directories
 DATA_DIR = "crawled_data"
 RESPONSE_DIR = "processed_results"
@@ -71,16 +65,12 @@ async def process_html_with_llm() -> Dict:
             """
 
             try:
-                # Process with LLM
-                completion = client.chat.completions.create(
-                    model="llama3.1:70b",
-                    messages=[
-                        {"role": "system", "content": "You are an expert at extracting tech event information from web pages. Return only valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ]
+                # Process with LLM (cached by model + prompts)
+                raw_response = await chat_completion(
+                    "You are an expert at extracting tech event information from web pages. Return only valid JSON.",
+                    prompt,
+                    validate=is_json_object
                 )
-
-                raw_response = completion.choices[0].message.content
                 # print(f"Raw API response for {filename}: {raw_response}")
 
                 # Filter and parse JSON response
@@ -0,0 +1,294 @@
+import json
+import math
+import os
+import random
+import re
+import sys
+import zlib
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.services import dates
+
+load_dotenv()
+
+# Chunks scoring below the drop threshold skip the LLM entirely; chunks above
+# the keep threshold go straight to extraction without analyze_chunk
+RELEVANCE_DROP_THRESHOLD = float(os.getenv("RELEVANCE_DROP_THRESHOLD", "0.15"))
+RELEVANCE_KEEP_THRESHOLD = float(os.getenv("RELEVANCE_KEEP_THRESHOLD", "0.85"))
+# Optional trained hashed-feature model (see `python -m app.services.relevance train`)
+RELEVANCE_MODEL = os.getenv("RELEVANCE_MODEL", os.path.join("processed_results", "relevance_model.json"))
+
+FIXTURES_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'relevance_fixtures.jsonl')
+
+EVENT_TERMS = re.compile(
+    r'\b(hackathons?|hack(?:ing)? weekend|conferences?|meetups?|summits?|workshops?|bootcamps?|'
+    r'buildathons?|game jams?|demo days?|keynotes?|speakers?|agenda|venue|tracks?|sponsors?|judges?|mentors?)\b',
+    re.IGNORECASE
+)
+ACTION_TERMS = re.compile(
+    r'\b(register|registration|apply|applications?|sign up|rsvp|submit|submissions?|deadline|'
+    r'tickets?|participants?|teams? of|eligib\w+|join us)\b',
+    re.IGNORECASE
+)
+PRIZE_PATTERNS = re.compile(
+    r'(?:[$€£₹]\s?\d[\d,.]*\s?(?:k|m|million)?\b|\b\d[\d,.]*\s?(?:k|m)?\s?(?:usd|eur|inr|usdc|eth)\b|'
+    r'\bprizes?\b|\bprize pool\b|\bbount(?:y|ies)\b|\bgrants?\b|\bswag\b)',
+    re.IGNORECASE
+)
+BOILERPLATE_TERMS = re.compile(
+    r'\b(cookies?|privacy policy|terms of (?:service|use)|all rights reserved|copyright|'
+    r'newsletter|unsubscribe|javascript|enable javascript|log ?in|sign in|password|'
+    r'follow us|skip to content|accept all)\b|©',
+    re.IGNORECASE
+)
+
+# Hand-set weights of the default linear scorer (log-odds per capped count)
+DEFAULT_WEIGHTS = {
+    "bias": -2.5,
+    "event_terms": 0.9,
+    "action_terms": 0.6,
+    "dates": 0.8,
+    "prizes": 0.9,
+    "boilerplate": -1.2,
+    "short": -0.8
+}
+
+HASH_DIM = 1 << 18
+
+_stats = {"chunks": 0, "dropped": 0, "fast_tracked": 0, "sent_to_llm": 0}
+
+def features(text: str) -> Dict[str, float]:
+    """Capped pattern counts the scorer is built on"""
+    return {
+        "event_terms": min(len(EVENT_TERMS.findall(text)), 5),
+        "action_terms": min(len(ACTION_TERMS.findall(text)), 4),
+        "dates": min(len(dates.find_dates(text)), 3),
+        "prizes": min(len(PRIZE_PATTERNS.findall(text)), 3),
+        "boilerplate": min(len(BOILERPLATE_TERMS.findall(text)), 4),
+        "short": 1.0 if len(text.split()) < 20 else 0.0
+    }
+
+def _sigmoid(value: float) -> float:
+    return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, value))))
+
+def hashed_features(text: str) -> Dict[int, float]:
+    """Word unigram and bigram counts hashed into HASH_DIM buckets"""
+    words = re.findall(r'[a-z0-9$€£]+', text.lower())
+    counts: Dict[int, float] = {}
+    for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        index = zlib.crc32(gram.encode('utf-8')) % HASH_DIM
+        counts[index] = counts.get(index, 0.0) + 1.0
+    # Scale so long chunks do not dominate
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {index: value / norm for index, value in counts.items()}
+
+class HashedLinearModel:
+    """
+    Logistic regression over hashed n-grams plus the pattern features
+
+    Weights are a sparse {bucket: weight} map saved as JSON, so the model
+    stays small and loads without extra dependencies.
+    """
+
+    def __init__(self, bias: float = 0.0, weights: Dict[int, float] = None,
+                 feature_weights: Dict[str, float] = None):
+        self.bias = bias
+        self.weights = weights or {}
+        self.feature_weights = feature_weights or {}
+
+    def score(self, text: str) -> float:
+        value = self.bias
+        for index, x in hashed_features(text).items():
+            value += self.weights.get(index, 0.0) * x
+        for name, x in features(text).items():
+            value += self.feature_weights.get(name, 0.0) * x
+        return _sigmoid(value)
+
+    def train(self, examples: List[Tuple[str, int]], epochs: int = 20, learning_rate: float = 0.3,
+              l2: float = 1e-4, seed: int = 0):
+        """Plain SGD on log loss"""
+        prepared = [(hashed_features(text), features(text), label) for text, label in examples]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(prepared)
+            for hashed, named, label in prepared:
+                value = self.bias
+                value += sum(self.weights.get(i, 0.0) * x for i, x in hashed.items())
+                value += sum(self.feature_weights.get(n, 0.0) * x for n, x in named.items())
+                gradient = _sigmoid(value) - label
+                self.bias -= learning_rate * gradient
+                for i, x in hashed.items():
+                    w = self.weights.get(i, 0.0)
+                    self.weights[i] = w - learning_rate * (gradient * x + l2 * w)
+                for n, x in named.items():
+                    w = self.feature_weights.get(n, 0.0)
+                    self.feature_weights[n] = w - learning_rate * (gradient * x + l2 * w)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "bias": self.bias,
+                "feature_weights": self.feature_weights,
+                "weights": {str(i): round(w, 6) for i, w in self.weights.items() if abs(w) > 1e-6}
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HashedLinearModel":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(
+            bias=data["bias"],
+            weights={int(i): w for i, w in data["weights"].items()},
+            feature_weights=data.get("feature_weights", {})
+        )
+
+_model: Optional[HashedLinearModel] = None
+_model_loaded = False
+
+def get_model() -> Optional[HashedLinearModel]:
+    """The trained model if RELEVANCE_MODEL exists, else None"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        _model_loaded = True
+        if RELEVANCE_MODEL and os.path.exists(RELEVANCE_MODEL):
+            try:
+                _model = HashedLinearModel.load(RELEVANCE_MODEL)
+                print(f"Loaded relevance model from {RELEVANCE_MODEL}")
+            except Exception as e:
+                print(f"Error loading relevance model: {str(e)}")
+    return _model
+
+def score(text: str) -> float:
+    """Probability-like relevance of a chunk, from the trained model or the default weights"""
+    model = get_model()
+    if model is not None:
+        return model.score(text)
+    value = DEFAULT_WEIGHTS["bias"]
+    for name, x in features(text).items():
+        value += DEFAULT_WEIGHTS[name] * x
+    return _sigmoid(value)
+
+def classify(text: str, drop_threshold: float = RELEVANCE_DROP_THRESHOLD,
+             keep_threshold: float = RELEVANCE_KEEP_THRESHOLD) -> Tuple[str, float]:
+    """
+    Decide what to do with a chunk
+
+    Returns:
+        ('drop' | 'keep' | 'llm', score)
+    """
+    return _decide(score(text), drop_threshold, keep_threshold)
+
+def _decide(value: float, drop_threshold: float, keep_threshold: float) -> Tuple[str, float]:
+    if value < drop_threshold:
+        return 'drop', value
+    if value >= keep_threshold:
+        return 'keep', value
+    return 'llm', value
+
+def record(decisions: List[str]):
+    """Count one page's decisions in the running totals"""
+    _stats["chunks"] += len(decisions)
+    _stats["dropped"] += decisions.count('drop')
+    _stats["fast_tracked"] += decisions.count('keep')
+    _stats["sent_to_llm"] += decisions.count('llm')
+
+def get_stats() -> Dict:
+    """Pre-filter totals since startup"""
+    return {
+        **_stats,
+        "llm_fraction": round(_stats["sent_to_llm"] / _stats["chunks"], 3) if _stats["chunks"] else 0.0,
+        "model": "hashed" if get_model() is not None else "default"
+    }
+
+def load_fixtures(path: str = FIXTURES_FILE) -> List[Tuple[str, int]]:
+    """Labeled chunks, one {"text", "label"} JSON object per line (label 1 = has an event)"""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                examples.append((item["text"], int(item["label"])))
+    return examples
+
+def split_fixtures(examples: List[Tuple[str, int]], holdout: float = 0.25,
+                   seed: int = 0) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    """
+    Deterministic (train, held-out) split, stratified by label
+
+    A trained model must be evaluated on the held-out part only; scoring it
+    on the chunks it was trained on says nothing about recall on new pages.
+    """
+    rng = random.Random(seed)
+    train, held_out = [], []
+    for label in sorted({label for _, label in examples}):
+        group = [example for example in examples if example[1] == label]
+        rng.shuffle(group)
+        count = round(len(group) * holdout)
+        held_out.extend(group[:count])
+        train.extend(group[count:])
+    return train, held_out
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return round(numerator / denominator, 3) if denominator else 1.0
+
+def evaluate(examples: List[Tuple[str, int]], drop_threshold: float = RELEVANCE_DROP_THRESHOLD,
+             keep_threshold: float = RELEVANCE_KEEP_THRESHOLD,
+             model: Optional[HashedLinearModel] = None) -> Dict:
+    """
+    Precision/recall of the pre-filter against labeled chunks
+
+    Relevant chunks must never be dropped (recall), fast-tracked chunks
+    should be relevant (keep precision), and the fewer chunks left for the
+    LLM the better (llm_fraction). Scores with `model` if given, else like
+    `classify` does.
+    """
+    scorer = model.score if model is not None else score
+    decisions = [(_decide(scorer(text), drop_threshold, keep_threshold)[0], label) for text, label in examples]
+    relevant = sum(1 for _, label in decisions if label)
+    dropped = [label for decision, label in decisions if decision == 'drop']
+    kept = [label for decision, label in decisions if decision == 'keep']
+    passed_relevant = sum(1 for decision, label in decisions if label and decision != 'drop')
+    return {
+        "examples": len(examples),
+        "relevant": relevant,
+        "recall": _ratio(passed_relevant, relevant),
+        "drop_precision": _ratio(sum(1 for label in dropped if not label), len(dropped)),
+        "keep_precision": _ratio(sum(kept), len(kept)),
+        "dropped": len(dropped),
+        "fast_tracked": len(kept),
+        "llm_fraction": _ratio(sum(1 for decision, _ in decisions if decision == 'llm'), len(decisions))
+    }
+
+if __name__ == "__main__":
+    # python -m app.services.relevance evaluate [fixtures.jsonl] [--holdout 0.25]
+    # python -m app.services.relevance train [fixtures.jsonl] [model.json] [--holdout 0.25]
+    #
+    # train fits on the fixtures minus a held-out split and reports metrics
+    # on that split. evaluate scores the default weights on every fixture,
+    # or a trained model (RELEVANCE_MODEL) on the held-out split only.
+    args = sys.argv[1:]
+    holdout = 0.25
+    if "--holdout" in args:
+        position = args.index("--holdout")
+        holdout = float(args[position + 1])
+        del args[position:position + 2]
+    command = args[0] if args else "evaluate"
+    fixtures = load_fixtures(args[1] if len(args) > 1 else FIXTURES_FILE)
+    train_set, held_out = split_fixtures(fixtures, holdout)
+    if command == "train":
+        model = HashedLinearModel()
+        model.train(train_set)
+        path = args[2] if len(args) > 2 else RELEVANCE_MODEL
+        model.save(path)
+        print(f"Saved relevance model to {path} (trained on {len(train_set)} fixtures)")
+        print(json.dumps(evaluate(held_out, model=model), indent=2))
+    elif command == "evaluate":
+        if get_model() is not None:
+            print(f"Evaluating the trained model on {len(held_out)} held-out fixtures")
+            print(json.dumps(evaluate(held_out), indent=2))
+        else:
+            print(json.dumps(evaluate(fixtures), indent=2))
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from fastapi import Request, Response
+
+# Brotli is used when installed; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Suffix distinguishing each encoded variant's ETag from the identity body's
+ETAG_SUFFIXES = {'gzip': '-gz', 'br': '-br'}
+
+class CachedBody:
+    """One serialized response version with per-encoding ETags and compressed variants"""
+
+    def __init__(self, version: Hashable, payload: Any):
+        self.version = version
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{self.digest}"'
+        # Compress once per version, not once per request
+        self.encoded: Dict[str, bytes] = {'gzip': gzip.compress(self.body, compresslevel=6)}
+        if brotli is not None:
+            self.encoded['br'] = brotli.compress(self.body, quality=5)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Strong ETag of the body served with this Content-Encoding (None for identity)"""
+        if encoding is None:
+            return self.etag
+        return f'"{self.digest}{ETAG_SUFFIXES[encoding]}"'
+
+class ResponseCache:
+    """
+    Process-level cache of pre-serialized JSON responses
+
+    Entries are keyed by request (e.g. path + query) and tagged with a data
+    version; a lookup with a newer version rebuilds the entry. Least
+    recently used entries beyond `max_entries` are dropped.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> CachedBody:
+        cached = self._entries.get(key)
+        if cached is not None and cached.version == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        cached = CachedBody(version, build())
+        self._entries[key] = cached
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self):
+        """Drop every entry (e.g. from a data write hook)"""
+        self._entries.clear()
+
+def _pick_encoding(accept_encoding: str, available: Dict[str, bytes]) -> Optional[str]:
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    for encoding in ('br', 'gzip'):
+        if encoding in accepted and encoding in available:
+            return encoding
+    return None
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """304 if the client already has this variant, else the best pre-compressed body"""
+    # Each encoding is a different byte sequence, so it gets its own strong ETag
+    encoding = _pick_encoding(request.headers.get('accept-encoding', ''), cached.encoded)
+    headers = {
+        'ETag': cached.etag_for(encoding),
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding'
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if headers['ETag'] in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        return Response(content=cached.encoded[encoding], media_type='application/json', headers=headers)
+    return Response(content=cached.body, media_type='application/json', headers=headers)
@@ -0,0 +1,111 @@
+import asyncio  # For concurrency limits and politeness delays
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Scheduler settings (override in .env)
+CRAWL_MAX_CONCURRENCY = int(os.getenv("CRAWL_MAX_CONCURRENCY", "8"))
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "2"))
+CRAWL_PER_HOST_DELAY = float(os.getenv("CRAWL_PER_HOST_DELAY", "1.0"))
+CRAWL_MAX_RETRIES = int(os.getenv("CRAWL_MAX_RETRIES", "2"))
+# Longest Retry-After we are willing to honor before giving up on a URL
+CRAWL_MAX_RETRY_AFTER = float(os.getenv("CRAWL_MAX_RETRY_AFTER", "60"))
+
+# Status codes that mean "slow down and try again"
+RETRYABLE_STATUSES = {429, 503}
+
+def host_of(url: str) -> str:
+    """Lowercased host used as the politeness key"""
+    return urlparse(url).netloc.lower()
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+class _HostState:
+    """Concurrency slot and next allowed request time for one host"""
+
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.next_allowed = 0.0
+        self.requests = 0
+        self.backoffs = 0
+
+class CrawlScheduler:
+    """
+    Global concurrency cap plus per-host limits and delays
+
+    Every fetch (and search) runs inside `async with scheduler.slot(url):`.
+    Fetches from different hosts overlap freely up to the global cap, while
+    each host sees at most `per_host` requests in flight, spaced at least
+    `per_host_delay` seconds apart. `backoff` pushes a host's next allowed
+    request time out after a 429/503.
+    """
+
+    def __init__(self, max_concurrency: int = CRAWL_MAX_CONCURRENCY,
+                 per_host: int = CRAWL_PER_HOST_CONCURRENCY,
+                 per_host_delay: float = CRAWL_PER_HOST_DELAY,
+                 host_delays: Optional[Dict[str, float]] = None):
+        self.per_host = max(1, per_host)
+        self.per_host_delay = per_host_delay
+        # Per-host overrides of the politeness delay, keyed by host
+        self.host_delays = host_delays or {}
+        self._global = asyncio.Semaphore(max(1, max_concurrency))
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _host(self, url: str) -> _HostState:
+        host = host_of(url)
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.per_host)
+        return self._hosts[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for a host slot, the host's politeness delay and a global slot"""
+        state = self._host(url)
+        async with state.semaphore:
+            # Reserve the next start time for this host, then sleep outside the lock
+            async with state.lock:
+                now = time.monotonic()
+                start_at = max(now, state.next_allowed)
+                state.next_allowed = start_at + self.host_delays.get(host_of(url), self.per_host_delay)
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            async with self._global:
+                state.requests += 1
+                yield
+
+    def backoff(self, url: str, delay: float):
+        """Hold off every request to this URL's host for `delay` seconds"""
+        state = self._host(url)
+        state.backoffs += 1
+        state.next_allowed = max(state.next_allowed, time.monotonic() + delay)
+        print(f"Backing off {host_of(url)} for {delay:.1f}s")
+
+    def stats(self) -> Dict:
+        """Per-host request and backoff counts"""
+        return {
+            host: {"requests": state.requests, "backoffs": state.backoffs}
+            for host, state in self._hosts.items()
+        }
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Processes for CPU-bound parsing and text preparation (0 runs it inline on the event loop)
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """Return the process-wide CPU pool, started on first use"""
+    global _executor
+    if _executor is None and CPU_WORKERS > 0:
+        _executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+        print(f"Started CPU pool with {CPU_WORKERS} workers")
+    return _executor
+
+async def run_cpu(func: Callable, *args):
+    """
+    Run a CPU-bound function in the process pool and await its result
+
+    `func` and its arguments must be picklable (module-level functions and
+    plain data). If the pool breaks (e.g. a worker was killed) it is
+    replaced and the call is retried once.
+    """
+    global _executor
+    executor = get_executor()
+    if executor is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        print("CPU pool broke, restarting it")
+        if _executor is executor:
+            _executor = None
+            executor.shutdown(wait=False)
+        return await loop.run_in_executor(get_executor(), func, *args)
+
+def shutdown():
+    """Stop the pool, dropping queued work"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
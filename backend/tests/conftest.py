@@ -0,0 +1,4 @@
+import os
+
+# app.services.llm builds its client at import; tests never call the API
+os.environ.setdefault("AI_API_KEY", "test")
@@ -0,0 +1,55 @@
+import random
+import pytest
+from app.services.chunker import blocks_from_text, chunk_blocks
+from app.services.llm import estimate_tokens
+
+WORDS = ["hackathon", "register", "prizes", "venue", "schedule", "March", "24", "teams",
+         "submission", "deadline", "judges", "workshop", "a", "the", "of", "sponsors"]
+
+
+def _random_blocks(rng: random.Random, count: int):
+    blocks = []
+    for _ in range(count):
+        if rng.random() < 0.15:
+            blocks.append({'type': 'heading', 'text': ' '.join(rng.choices(WORDS, k=rng.randint(1, 8)))})
+            continue
+        kind = rng.random()
+        if kind < 0.1:
+            # One unbroken run with no separators at all
+            text = 'x' * rng.randint(1, 12000)
+        elif kind < 0.3:
+            text = '\n'.join(' '.join(rng.choices(WORDS, k=rng.randint(1, 40))) for _ in range(rng.randint(1, 60)))
+        else:
+            sentences = [' '.join(rng.choices(WORDS, k=rng.randint(1, 30))) + '.' for _ in range(rng.randint(1, 80))]
+            text = ' '.join(sentences)
+        blocks.append({'type': 'text', 'text': text})
+    return blocks
+
+
+@pytest.mark.parametrize("max_tokens,overlap_tokens", [(1000, 100), (200, 50), (64, 16), (50, 0)])
+def test_chunks_stay_within_token_budget(max_tokens, overlap_tokens):
+    rng = random.Random(max_tokens)
+    for _ in range(50):
+        blocks = _random_blocks(rng, rng.randint(1, 40))
+        chunks = chunk_blocks(blocks, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        assert chunks
+        for chunk in chunks:
+            assert estimate_tokens(chunk) <= max_tokens
+
+
+def test_small_document_is_one_chunk():
+    blocks = blocks_from_text("Spring Hackathon\n\nMarch 24-26, 2027 in Berlin.\n\nRegister now.")
+    assert chunk_blocks(blocks) == ["Spring Hackathon\n\nMarch 24-26, 2027 in Berlin.\n\nRegister now."]
+
+
+def test_continuation_chunk_repeats_section_heading():
+    blocks = [{'type': 'heading', 'text': 'Prizes'}]
+    blocks += [{'type': 'text', 'text': f"Track {i} winners get {i * 100} dollars in prizes."} for i in range(40)]
+    chunks = chunk_blocks(blocks, max_tokens=80, overlap_tokens=10)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.startswith('Prizes')
+
+
+def test_empty_input_has_no_chunks():
+    assert chunk_blocks([]) == []
@@ -0,0 +1,71 @@
+from datetime import date
+import pytest
+from app.services.dates import find_dates, normalize_event_date, parse_range
+
+REFERENCE = date(2026, 6, 1)
+
+
+@pytest.mark.parametrize("text,start,end", [
+    ("2026-09-12", "2026-09-12", "2026-09-12"),
+    ("2026-09-12 to 2026-09-14", "2026-09-12", "2026-09-14"),
+    ("March 23-26, 2027", "2027-03-23", "2027-03-26"),
+    ("Dec 30, 2025 - Jan 2, 2026", "2025-12-30", "2026-01-02"),
+    ("Dec 30 - Jan 2, 2026", "2025-12-30", "2026-01-02"),
+    ("30 Dec 2025 - 2 Jan 2026", "2025-12-30", "2026-01-02"),
+    ("10-12 December 2025", "2025-12-10", "2025-12-12"),
+    ("Saturday, January 10th, 2026", "2026-01-10", "2026-01-10"),
+    ("10 January 2026", "2026-01-10", "2026-01-10"),
+    ("12/05/2026", "2026-12-05", "2026-12-05"),
+    ("25/05/2026", "2026-05-25", "2026-05-25"),
+])
+def test_formats(text, start, end):
+    found = parse_range(text, REFERENCE)
+    assert (found['start_iso'], found['end_iso']) == (start, end)
+    assert found['precision'] == 'day'
+    assert not found['year_inferred']
+
+
+def test_month_and_year_spans_the_month():
+    found = parse_range("February 2028", REFERENCE)
+    assert (found['start_iso'], found['end_iso'], found['precision']) == ("2028-02-01", "2028-02-29", "month")
+
+
+def test_yearless_date_uses_reference_year_unless_long_past():
+    assert parse_range("September 12", REFERENCE)['start_iso'] == "2026-09-12"
+    # Within the grace period it stays in the reference year
+    assert parse_range("May 20", REFERENCE)['start_iso'] == "2026-05-20"
+    # Well in the past, so it is next year's edition
+    found = parse_range("January 15", REFERENCE)
+    assert found['start_iso'] == "2027-01-15"
+    assert found['year_inferred']
+
+
+def test_yearless_range_crossing_new_year():
+    found = parse_range("Dec 30 - Jan 2", REFERENCE)
+    assert (found['start_iso'], found['end_iso']) == ("2026-12-30", "2027-01-02")
+
+
+def test_invalid_dates_are_ignored():
+    assert find_dates("February 30, 2026 and 2026-13-01", REFERENCE) == []
+    assert find_dates(None) == []
+    assert find_dates("no dates here") == []
+
+
+def test_all_dates_in_order_without_overlaps():
+    found = find_dates("Apply by May 1, 2026. The event runs March 23-26, 2027.", REFERENCE)
+    assert [(item['start_iso'], item['end_iso']) for item in found] == [
+        ("2026-05-01", "2026-05-01"), ("2027-03-23", "2027-03-26")
+    ]
+
+
+def test_normalize_event_date_places_yearless_end_after_start():
+    normalized = normalize_event_date({"start": "December 30, 2026", "end": "January 2"}, REFERENCE)
+    assert normalized == {'start_iso': "2026-12-30", 'end_iso': "2027-01-02", 'precision': 'day'}
+
+
+def test_normalize_event_date_accepts_ranges_strings_and_unknowns():
+    assert normalize_event_date("March 23-26, 2027", REFERENCE)['end_iso'] == "2027-03-26"
+    assert normalize_event_date({"start": "2027-03-23", "end": "2027-03-01"}, REFERENCE)['end_iso'] == "2027-03-23"
+    assert normalize_event_date({"start": "unknown", "end": "unknown"}, REFERENCE) == {
+        'start_iso': None, 'end_iso': None, 'precision': 'unknown'
+    }
@@ -0,0 +1,82 @@
+import asyncio
+from app.services import dedup
+
+
+def _event(title, start, end=None, organizer=None, **fields):
+    return {"title": title, "date": {"start": start, "end": end or start}, "organizer": organizer, **fields}
+
+
+def _run(events, use_llm=False):
+    return asyncio.run(dedup.deduplicate(events, use_llm=use_llm))
+
+
+def test_duplicates_merge_into_the_most_complete_event():
+    events = [
+        _event("HackMIT 2026", "2026-09-12", "2026-09-14", "MIT", mode="in-person", prizes=["$10k"]),
+        _event("HackMIT", "September 12, 2026", organizer="unknown", location="Cambridge, MA"),
+        _event("Spring Game Jam", "2026-04-01"),
+    ]
+    deduped, stats = _run(events)
+    assert stats["output_events"] == 2
+    merged = next(event for event in deduped if event["title"] == "HackMIT 2026")
+    assert merged["organizer"] == "MIT"
+    assert merged["prizes"] == ["$10k"]
+    # Known fields from the less complete duplicate are filled in
+    assert merged["location"] == "Cambridge, MA"
+
+
+def test_merging_is_transitive_across_a_cluster():
+    # The first and last do not overlap, but both match the middle one
+    events = [
+        _event("ETHGlobal London", "2026-03-14"),
+        _event("ETHGlobal London 2026", "2026-03-14", "2026-03-16"),
+        _event("ETHGlobal: London", "March 16, 2026"),
+    ]
+    deduped, stats = _run(events)
+    assert stats["output_events"] == 1
+    assert len(deduped) == 1
+
+
+def test_editions_with_conflicting_dates_stay_apart():
+    events = [_event("DevFest Berlin", "2025-11-08"), _event("DevFest Berlin", "2026-11-07")]
+    deduped, _ = _run(events)
+    assert len(deduped) == 2
+
+
+def test_merged_lists_keep_unique_known_items():
+    merged = dedup.merge_events([
+        {"title": "A", "tech_stack": ["Python", "Rust"], "prizes": ["unknown"]},
+        {"title": "A", "tech_stack": ["python", "Go"], "prizes": ["$5k"], "mode": "online"},
+    ])
+    # The second is more complete, so it is the base; case-only repeats are dropped
+    assert merged["tech_stack"] == ["python", "Go", "Rust"]
+    assert merged["prizes"] == ["$5k"]
+
+
+def test_llm_merges_are_applied_to_ambiguous_clusters(monkeypatch):
+    events = [
+        _event("PyData Berlin", "2026-10-01"),
+        _event("PyData Berlin Meetup Night", "2026-10-01"),
+        _event("Rust Conf", "2026-10-01"),
+    ]
+    a, b = dedup._Features(events[0]), dedup._Features(events[1])
+    assert dedup.classify_pair(a, b) == 'ambiguous'
+
+    seen = []
+
+    async def resolve(clusters, all_events):
+        seen.extend(clusters)
+        return [sorted(cluster) for cluster in clusters]
+
+    monkeypatch.setattr(dedup, "_resolve_with_llm", resolve)
+    deduped, stats = _run(events, use_llm=True)
+    assert seen == [[0, 1]]
+    assert stats["llm_merges"] == 1
+    assert len(deduped) == 2
+
+
+def test_ambiguous_clusters_stay_apart_without_the_llm():
+    events = [_event("PyData Berlin", "2026-10-01"), _event("PyData Berlin Meetup Night", "2026-10-01")]
+    deduped, stats = _run(events)
+    assert stats["ambiguous_clusters"] == 1
+    assert len(deduped) == 2
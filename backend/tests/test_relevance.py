@@ -0,0 +1,34 @@
+import pytest
+from app.services import relevance
+
+
+@pytest.fixture
+def default_weights(monkeypatch):
+    """Score with DEFAULT_WEIGHTS even if a trained model is on disk"""
+    monkeypatch.setattr(relevance, "_model", None)
+    monkeypatch.setattr(relevance, "_model_loaded", True)
+
+
+def test_default_weights_never_drop_a_relevant_fixture(default_weights):
+    report = relevance.evaluate(relevance.load_fixtures())
+    assert report["relevant"] > 0
+    assert report["recall"] == 1.0
+
+
+def test_split_is_deterministic_stratified_and_disjoint():
+    fixtures = relevance.load_fixtures()
+    train, held_out = relevance.split_fixtures(fixtures, holdout=0.25)
+    assert (train, held_out) == relevance.split_fixtures(fixtures, holdout=0.25)
+    assert sorted(train + held_out) == sorted(fixtures)
+    assert not set(train) & set(held_out)
+    for label in (0, 1):
+        assert any(example[1] == label for example in held_out)
+
+
+def test_trained_model_is_evaluated_on_held_out_fixtures():
+    train, held_out = relevance.split_fixtures(relevance.load_fixtures())
+    model = relevance.HashedLinearModel()
+    model.train(train)
+    report = relevance.evaluate(held_out, model=model)
+    assert report["examples"] == len(held_out)
+    assert report["recall"] == 1.0
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import EventCard from './components/EventCard'
 import Navbar from './components/Navbar'
 import Hero from './components/Hero'
@@ -6,38 +6,77 @@ import Filter from './components/Filter'
 import Documentation from './components/Documentation'
 import { Routes, Route } from 'react-router-dom'
 
+const API_URL = 'http://localhost:8000'
+const PAGE_SIZE = 60
+
+// Filters are applied by the server, so every page already matches them
+async function fetchEvents({ type, upcoming, offset }) {
+  const params = new URLSearchParams({ limit: PAGE_SIZE, offset })
+  if (type !== 'all') params.set('event_type', type)
+  if (upcoming) params.set('upcoming', 'true')
+  const response = await fetch(`${API_URL}/results?${params}`)
+  const data = await response.json()
+  return data.status === 'success' ? data : { data: [], total: 0 }
+}
+
 function App() {
   const [events, setEvents] = useState([])
+  const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [initialized, setInitialized] = useState(false)
   const [selectedType, setSelectedType] = useState('all')
+  const [upcomingOnly, setUpcomingOnly] = useState(false)
+  const [eventTypes, setEventTypes] = useState([])
+  // Bumped when the filters change, so responses for old filters are dropped
+  const requestId = useRef(0)
 
+  // Event types across the whole store, not just the loaded page
   useEffect(() => {
-    const fetchEvents = async () => {
-      try {
-        const response = await fetch('http://localhost:8000/results')
-        const data = await response.json()
-        if (data.status === 'success') {
-          setEvents(data.data)
-        }
-        setLoading(false)
-      } catch (error) {
-        console.error('Error fetching events:', error)
-        setLoading(false)
-      }
-    }
-
-    fetchEvents()
+    fetch(`${API_URL}/api/crawler/status`)
+      .then(response => response.json())
+      .then(data => setEventTypes(
+        Object.keys(data.event_types || {}).filter(type => type && type !== 'unknown')
+      ))
+      .catch(error => console.error('Error fetching event types:', error))
   }, [])
 
-  // Get unique event types
-  const eventTypes = [...new Set(events.map(event => event.event_type))]
+  // First page whenever the filters change
+  useEffect(() => {
+    const id = ++requestId.current
+    setLoading(true)
+    setLoadingMore(false)
+    fetchEvents({ type: selectedType, upcoming: upcomingOnly, offset: 0 })
+      .then(data => {
+        if (id !== requestId.current) return
+        setEvents(data.data)
+        setTotal(data.total)
+      })
+      .catch(error => console.error('Error fetching events:', error))
+      .finally(() => {
+        if (id !== requestId.current) return
+        setLoading(false)
+        setInitialized(true)
+      })
+  }, [selectedType, upcomingOnly])
 
-  // Filter events based on selected type
-  const filteredEvents = selectedType === 'all' 
-    ? events 
-    : events.filter(event => event.event_type === selectedType)
+  const loadMore = async () => {
+    const id = requestId.current
+    setLoadingMore(true)
+    try {
+      const data = await fetchEvents({ type: selectedType, upcoming: upcomingOnly, offset: events.length })
+      // The filters changed while this page was loading
+      if (id !== requestId.current) return
+      setEvents(previous => [...previous, ...data.data])
+      setTotal(data.total)
+    } catch (error) {
+      console.error('Error fetching events:', error)
+    } finally {
+      if (id === requestId.current) setLoadingMore(false)
+    }
+  }
 
-  if (loading) {
+  if (!initialized) {
     return (
       <div className="min-h-screen bg-white flex items-center justify-center">
         <div className="animate-spin rounded-full h-12 w-12 border-2 border-primary-500 border-t-transparent"></div>
@@ -53,21 +92,35 @@ function App() {
           <>
             <Hero />
             <main className="container mx-auto px-4 py-16">
-              <Filter 
-                selectedType={selectedType} 
+              <Filter
+                selectedType={selectedType}
                 setSelectedType={setSelectedType}
                 types={eventTypes}
+                upcomingOnly={upcomingOnly}
+                setUpcomingOnly={setUpcomingOnly}
               />
-              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-                {filteredEvents.map((event, index) => (
-                  <EventCard key={index} event={event} />
+              <div className={`grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8 transition-opacity ${loading ? 'opacity-50' : ''}`}>
+                {events.map((event) => (
+                  <EventCard key={event.id} event={event} />
                 ))}
               </div>
+              {events.length < total && (
+                <div className="mt-12 flex justify-center">
+                  <button
+                    onClick={loadMore}
+                    disabled={loadingMore}
+                    className="bg-white text-surface-600 px-6 py-3 rounded-full ring-1 ring-surface-200
+                             hover:bg-surface-50 transition-all duration-300 font-medium disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Loading...' : `Load more (${total - events.length} left)`}
+                  </button>
+                </div>
+              )}
             </main>
           </>
         } />
         <Route path="/docs" element={<Documentation />} />
-      
+
       </Routes>
     </div>
   )
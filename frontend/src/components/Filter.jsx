@@ -1,6 +1,6 @@
-function Filter({ selectedType, setSelectedType, types }) {
+function Filter({ selectedType, setSelectedType, types, upcomingOnly, setUpcomingOnly }) {
   return (
-    <div className="mb-12 flex justify-center">
+    <div className="mb-12 flex justify-center items-center gap-4">
       <div className="relative inline-block">
         <select
           value={selectedType}
@@ -23,6 +23,15 @@ function Filter({ selectedType, setSelectedType, types }) {
           </svg>
         </div>
       </div>
+      <button
+        onClick={() => setUpcomingOnly(!upcomingOnly)}
+        className={`px-6 py-3 rounded-full ring-1 transition-all duration-300 font-medium
+                  ${upcomingOnly
+                    ? 'bg-primary-500 text-white ring-primary-500'
+                    : 'bg-white text-surface-600 ring-surface-200 hover:bg-surface-50'}`}
+      >
+        Upcoming only
+      </button>
     </div>
   )
 }